@@ -1,48 +1,202 @@
 # config/settings.py
 
 import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from typing import Dict, Optional, Tuple
+from dotenv import dotenv_values
 
 # Base directory for the project
 BASE_DIR = Path(__file__).resolve().parent.parent
+CONFIG_DIR = Path(__file__).resolve().parent
+
+# .env is compiled into a plain Python module so later starts import cached bytecode
+ENV_CACHE_PATH = CONFIG_DIR / '_env_cache.py'
+
+
+def _find_env_file() -> Optional[Path]:
+    """Locate the .env file, preferring config/.env over the project root."""
+    for candidate in (CONFIG_DIR / '.env', BASE_DIR / '.env'):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _write_env_cache(env_file: Path, values: Dict[str, str]) -> None:
+    """Write the parsed .env values to the cache module atomically."""
+    source = (
+        "# Generated from .env by config/settings.py - do not edit.\n"
+        f"SOURCE = {str(env_file)!r}\n"
+        f"ENV = {values!r}\n"
+    )
+    # The cache holds the API key, so keep it owner-only like a private .env should be
+    tmp_path = ENV_CACHE_PATH.with_suffix('.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(source)
+    os.chmod(tmp_path, 0o600)  # O_CREAT's mode does not apply to a leftover temp file
+    os.replace(tmp_path, ENV_CACHE_PATH)
+
+
+def load_env() -> None:
+    """
+    Load the .env file into os.environ without overriding existing variables.
+
+    Uses the compiled cache module when it is at least as new as the .env file,
+    otherwise parses the .env file and regenerates the cache.
+    """
+    env_file = _find_env_file()
+    if env_file is None:
+        return
+
+    values = None
+    try:
+        if ENV_CACHE_PATH.stat().st_mtime >= env_file.stat().st_mtime:
+            from config import _env_cache
+            if _env_cache.SOURCE == str(env_file):
+                values = _env_cache.ENV
+    except (OSError, ImportError, AttributeError):
+        values = None
+
+    if values is None:
+        values = {k: v for k, v in dotenv_values(env_file).items() if v is not None}
+        try:
+            _write_env_cache(env_file, values)
+        except OSError:
+            pass  # Read-only checkout; parsing every start still works
+
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+
 
-# Configuration settings
-CONFIG = {
+# Load environment variables from .env file
+load_env()
+
+
+@dataclass(frozen=True, slots=True)
+class TranscriptionSettings:
+    """Settings for the transcription API."""
+    api_url: str = 'https://api.groq.com/openai/v1/audio/transcriptions'
+    model: str = 'whisper-large-v3'
+    response_format: str = 'json'
+    language: Optional[str] = None
+    temperature: str = '0'
+    timestamp_granularities: Tuple[str, ...] = ('segment',)
+    max_concurrency: int = 10  # Chunks uploaded to the API at the same time
+    skip_preprocess: bool = False  # Encode API-ready chunks in one pass instead of split + preprocess
+    verify_output: bool = False  # Run ffprobe on every encoded chunk instead of a header check
+    keep_chunk_txt: bool = False  # Also write a plain-text transcript next to each chunk JSON
+    http_backend: str = 'httpx'  # 'httpx', or 'pycurl' to upload through libcurl when installed
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Application configuration, built once per process by get_config()."""
     # Worker settings
-    'max_workers': int(os.getenv('MAX_WORKERS', '3')),
-    'max_queue_size': int(os.getenv('MAX_QUEUE_SIZE', '20')),
+    max_workers: int = 3
+    max_queue_size: int = 20
 
     # Transcription settings
-    'transcription': {
-        'api_url': os.getenv('TRANSCRIPTION_API_URL', 'https://api.groq.com/openai/v1/audio/transcriptions'),
-        'model': os.getenv('TRANSCRIPTION_MODEL', 'whisper-large-v3'),
-        'response_format': os.getenv('TRANSCRIPTION_FORMAT', 'json'),
-        'language': os.getenv('TRANSCRIPTION_LANGUAGE', None),
-        'temperature': os.getenv('TRANSCRIPTION_TEMPERATURE', '0'),  # Added temperature setting
-        'timestamp_granularities': os.getenv('TIMESTAMP_GRANULARITIES', 'segment').split(','),
-    },
-
-    'max_file_size': 25 * 1024 * 1024,  # 25 MB
-    'supported_formats': ['flac', 'mp3', 'mp4', 'mpeg', 'mpga', 'm4a', 'ogg', 'wav', 'webm'],
+    transcription: TranscriptionSettings = field(default_factory=TranscriptionSettings)
+
+    max_file_size: int = 25 * 1024 * 1024  # 25 MB
+    supported_formats: Tuple[str, ...] = ('flac', 'mp3', 'mp4', 'mpeg', 'mpga', 'm4a', 'ogg', 'wav', 'webm')
 
     # Chunk settings
-    'chunk_max_size_bytes': 25 * 1024 * 1024,  # 25 MB
-    'chunk_duration_sec': int(os.getenv('CHUNK_DURATION_SEC', '300')),  # Chunk duration in seconds
+    chunk_max_size_bytes: int = 25 * 1024 * 1024  # 25 MB
+    chunk_duration_sec: int = 0  # Chunk duration in seconds; 0 sizes chunks to the upload limit
+
+    # Audio settings
+    audio_format: str = 'wav'
+    sample_rate: int = 16000
+    channels: int = 1
 
     # Directory settings
-    'temp_dir': BASE_DIR / 'temp',
-    'downloaded_videos_dir': BASE_DIR / 'downloaded_videos',
-    'output_dir': BASE_DIR / 'transcripts',
-    'logs_dir': BASE_DIR / 'logs',
+    temp_dir: Path = BASE_DIR / 'temp'
+    downloaded_videos_dir: Path = BASE_DIR / 'downloaded_videos'
+    output_dir: Path = BASE_DIR / 'transcripts'
+    logs_dir: Path = BASE_DIR / 'logs'
+    cache_dir: Path = BASE_DIR / 'cache'
+    cache_max_bytes: int = 2 * 1024 ** 3  # Least recently used entries are evicted past this; 0 disables
+    cache_max_age_days: int = 30  # Entries unused for longer are evicted; 0 disables
 
     # Logging settings
-    'log_file': os.getenv('LOG_FILE', 'transcriber.log'),
+    log_file: str = 'transcriber.log'
+    log_level: str = 'INFO'
 
     # API settings
-    'api_timeout': int(os.getenv('API_TIMEOUT', '300')),
-    'api_key': os.getenv('GROQ_API_KEY'),
-}
+    api_timeout: int = 300
+    api_key: Optional[str] = None
+    api_retry_delay: int = 30  # Fallback when the API sends no Retry-After header
+    rate_limit_window: int = 60
+    rate_limit_requests: int = 50
+
+    # Download settings
+    max_retries: int = 3
+    retry_delay: int = 5
+    download_timeout: int = 3600  # 1 hour
+    verify_timeout: int = 300  # 5 minutes
+    max_concurrent_downloads: int = 4  # Used by VideoDownloader.download_many
+    keep_native_audio: bool = False  # Keep the downloaded audio as-is instead of converting to WAV
+
+
+# Environment variables read by get_config()
+_ENV_KEYS = (
+    'MAX_WORKERS',
+    'MAX_QUEUE_SIZE',
+    'MAX_CONCURRENT_DOWNLOADS',
+    'KEEP_NATIVE_AUDIO',
+    'CACHE_MAX_BYTES',
+    'CACHE_MAX_AGE_DAYS',
+    'TRANSCRIPTION_API_URL',
+    'TRANSCRIPTION_MODEL',
+    'TRANSCRIPTION_FORMAT',
+    'TRANSCRIPTION_LANGUAGE',
+    'TRANSCRIPTION_TEMPERATURE',
+    'TIMESTAMP_GRANULARITIES',
+    'TRANSCRIPTION_MAX_CONCURRENCY',
+    'TRANSCRIPTION_SKIP_PREPROCESS',
+    'TRANSCRIPTION_VERIFY_OUTPUT',
+    'TRANSCRIPTION_KEEP_CHUNK_TXT',
+    'TRANSCRIPTION_HTTP_BACKEND',
+    'CHUNK_DURATION_SEC',
+    'LOG_FILE',
+    'LOG_LEVEL',
+    'API_TIMEOUT',
+    'GROQ_API_KEY',
+)
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Settings:
+    """Build the settings from the environment once and return the cached instance."""
+    environ = os.environ
+    env = {key: environ[key] for key in _ENV_KEYS if key in environ}
+
+    return Settings(
+        max_workers=int(env.get('MAX_WORKERS', '3')),
+        max_queue_size=int(env.get('MAX_QUEUE_SIZE', '20')),
+        max_concurrent_downloads=int(env.get('MAX_CONCURRENT_DOWNLOADS', '4')),
+        keep_native_audio=env.get('KEEP_NATIVE_AUDIO', 'false').lower() in ('1', 'true', 'yes'),
+        cache_max_bytes=int(env.get('CACHE_MAX_BYTES', str(2 * 1024 ** 3))),
+        cache_max_age_days=int(env.get('CACHE_MAX_AGE_DAYS', '30')),
+        transcription=TranscriptionSettings(
+            api_url=env.get('TRANSCRIPTION_API_URL', 'https://api.groq.com/openai/v1/audio/transcriptions'),
+            model=env.get('TRANSCRIPTION_MODEL', 'whisper-large-v3'),
+            response_format=env.get('TRANSCRIPTION_FORMAT', 'json'),
+            language=env.get('TRANSCRIPTION_LANGUAGE'),
+            temperature=env.get('TRANSCRIPTION_TEMPERATURE', '0'),
+            timestamp_granularities=tuple(env.get('TIMESTAMP_GRANULARITIES', 'segment').split(',')),
+            max_concurrency=int(env.get('TRANSCRIPTION_MAX_CONCURRENCY', '10')),
+            skip_preprocess=env.get('TRANSCRIPTION_SKIP_PREPROCESS', 'false').lower() in ('1', 'true', 'yes'),
+            verify_output=env.get('TRANSCRIPTION_VERIFY_OUTPUT', 'false').lower() in ('1', 'true', 'yes'),
+            keep_chunk_txt=env.get('TRANSCRIPTION_KEEP_CHUNK_TXT', 'false').lower() in ('1', 'true', 'yes'),
+            http_backend=env.get('TRANSCRIPTION_HTTP_BACKEND', 'httpx').lower(),
+        ),
+        chunk_duration_sec=int(env.get('CHUNK_DURATION_SEC', '0')),
+        log_file=env.get('LOG_FILE', 'transcriber.log'),
+        log_level=env.get('LOG_LEVEL', 'INFO'),
+        api_timeout=int(env.get('API_TIMEOUT', '300')),
+        api_key=env.get('GROQ_API_KEY'),
+    )
@@ -2,8 +2,7 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 import threading
-import time
-from typing import List
+from typing import Dict, List, Tuple
 
 # Dynamically add project root to PYTHONPATH
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -18,11 +17,30 @@ from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.widgets import TextArea, Frame
 from prompt_toolkit.styles import Style
 
+# Style class for each task status; statuses not listed render unstyled
+_STATUS_STYLE: Dict[TaskStatus, str] = {
+    TaskStatus.FAILED: 'class:status.error',
+    TaskStatus.COMPLETED: 'class:status.success',
+    TaskStatus.DOWNLOADING: 'class:status.processing',
+    TaskStatus.SPLITTING: 'class:status.processing',
+    TaskStatus.TRANSCRIBING: 'class:status.processing',
+}
+
+# Accepted URL schemes for new tasks
+_URL_PREFIX = ('http://', 'https://')
+
+# Shared constant fragments; prompt_toolkit never mutates formatted text
+_NO_TASKS_LINES = [('', 'No active tasks\n')]
+
 class SimpleTranscriptionUI:
     def __init__(self):
-        self.manager = TranscriptionManager()
+        self.manager = TranscriptionManager(on_task_update=self.schedule_refresh)
         self.kb = KeyBindings()
-        self.stop_event = threading.Event()
+
+        # Formatted lines per task id, keyed by the task revision they were rendered from
+        self._line_cache: Dict[str, Tuple[int, List[tuple[str, str]]]] = {}
+        self._rendered_count = -1
+        self._refresh_pending = threading.Event()
         
         # Create display
         self.status_control = FormattedTextControl(text=[])
@@ -47,22 +65,18 @@ class SimpleTranscriptionUI:
             ])),
             key_bindings=self.kb,
             full_screen=True,
-            style=self.get_style()
+            style=self.get_style(),
+            min_redraw_interval=0.1,
         )
 
         # Setup quit command
         @self.kb.add('c-c', eager=True)
         @self.kb.add('c-q', eager=True)
         def _(event):
-            self.stop_event.set()
             event.app.exit()
 
-        # Start update thread
-        self.update_thread = threading.Thread(
-            target=self.update_display,
-            daemon=True
-        )
-        self.update_thread.start()
+        # Initial render; later renders are triggered by task changes
+        self.render()
 
     def get_style(self) -> Style:
         return Style.from_dict({
@@ -74,59 +88,77 @@ class SimpleTranscriptionUI:
 
     def format_task_status(self, task: TranscriptionTask) -> List[tuple[str, str]]:
         # Get appropriate style
-        style = 'status.'
-        if task.status == TaskStatus.FAILED:
-            style += 'error'
-        elif task.status == TaskStatus.COMPLETED:
-            style += 'success'
-        elif task.status in (TaskStatus.DOWNLOADING, TaskStatus.SPLITTING, TaskStatus.TRANSCRIBING):
-            style += 'processing'
-        else:
-            style = ''
+        style = _STATUS_STYLE.get(task.status, '')
         
         # Format the status line
         progress = f"{task.stats.progress:.1f}%" if task.stats and task.stats.progress else "0%"
-        title = task.title or task.url[:50]
-        
+        # One pre-joined fragment per row; the trailing blank line carries no visible style
         return [
-            (f'class:{style}', f"{title}\n"),
-            (f'class:{style}', f"Status: {task.status.value} | Progress: {progress}\n"),
-            ('', '\n')
+            (style, f"{task.display_title}\nStatus: {task.status.value} | Progress: {progress}\n\n"),
         ]
 
+    def get_task_lines(self, task: TranscriptionTask) -> Tuple[List[tuple[str, str]], bool]:
+        """Return the formatted lines for a task and whether they were re-rendered."""
+        revision = task.revision
+        cached = self._line_cache.get(task.id)
+        if cached is not None and cached[0] == revision:
+            return cached[1], False
+
+        lines = self.format_task_status(task)
+        self._line_cache[task.id] = (revision, lines)
+        return lines, True
+
     def handle_input(self, buffer) -> None:
         text = buffer.text.strip()
         if not text:
             return
             
         if text.lower() in ('q', 'quit', 'exit'):
-            self.stop_event.set()
             self.app.exit()
-        elif text.startswith('http'):
-            self.manager.add_task(text)
+        elif text.startswith(_URL_PREFIX):
+            if self.manager.add_task(text):
+                self.render()
         
         buffer.text = ""
 
-    def update_display(self) -> None:
-        while not self.stop_event.is_set():
-            try:
-                # Format status display
-                lines = []
-                if not self.manager.tasks:
-                    lines = [('', 'No active tasks\n')]
-                else:
-                    for task in self.manager.tasks:
-                        lines.extend(self.format_task_status(task))
-                
-                # Update display
+    def schedule_refresh(self) -> None:
+        """Request a render on the UI event loop; safe to call from any thread."""
+        if self._refresh_pending.is_set():
+            return  # A render is already queued and will pick up this change
+        loop = self.app.loop
+        if loop is None or loop.is_closed():
+            return
+        self._refresh_pending.set()
+        loop.call_soon_threadsafe(self.render)
+
+    def render(self) -> None:
+        """Rebuild the status display from changed tasks and invalidate the app."""
+        self._refresh_pending.clear()
+        try:
+            # The manager replaces its task tuple on every change, so one read is a consistent view
+            tasks = self.manager.tasks
+
+            # Format status display, re-rendering only tasks that changed
+            lines = []
+            changed = len(tasks) != self._rendered_count
+            if not tasks:
+                lines = _NO_TASKS_LINES
+            else:
+                get_lines = self.get_task_lines
+                extend = lines.extend
+                for task in tasks:
+                    task_lines, task_changed = get_lines(task)
+                    extend(task_lines)
+                    changed = changed or task_changed
+
+            # Update display only when something changed
+            if changed:
+                self._rendered_count = len(tasks)
                 self.status_control.text = lines
                 self.app.invalidate()
-                
-                # Wait before next update
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"Display update error: {e}")
+
+        except Exception as e:
+            print(f"Display update error: {e}")
 
     def run(self) -> None:
         try:
@@ -134,7 +166,6 @@ class SimpleTranscriptionUI:
         except Exception as e:
             print(f"Application error: {e}")
         finally:
-            self.stop_event.set()
             self.manager.shutdown()
 
 def main():
@@ -0,0 +1,22 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+if orjson is not None:
+    def dumps(obj, pretty: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes, indented by two spaces if pretty."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    loads = orjson.loads
+else:
+    def dumps(obj, pretty: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes, indented by two spaces if pretty."""
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    loads = json.loads
@@ -1,52 +1,71 @@
 import logging
 import sys
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
-from config.settings import CONFIG
+from config.settings import get_config
 
-def setup_logger(name: str = None) -> logging.Logger:
-    """
-    Set up and configure a logger instance.
 
-    Args:
-        name: Logger name (defaults to the root logger if None)
+def _level() -> int:
+    """Determine log level from the settings or default to INFO."""
+    log_level = get_config().log_level.upper()
+    return getattr(logging, log_level, logging.INFO)
+
+
+@lru_cache(maxsize=1)
+def _init_root() -> logging.Logger:
+    """
+    Configure the root logger with file and console handlers exactly once.
 
     Returns:
-        Configured logger instance
+        The configured root logger
     """
+    config = get_config()
+
     # Create logs directory if it doesn't exist
-    logs_dir = CONFIG['logs_dir']
+    logs_dir = config.logs_dir
     logs_dir.mkdir(parents=True, exist_ok=True)
 
-    # Determine log level from CONFIG or default to INFO
-    log_level = CONFIG.get('log_level', 'INFO').upper()
-    numeric_level = getattr(logging, log_level, logging.INFO)
+    numeric_level = _level()
 
-    # Create or get the logger
-    logger = logging.getLogger(name)
-    logger.setLevel(numeric_level)
+    # Third-party loggers inherit the root level; keep them at WARNING
+    root = logging.getLogger()
+    root.setLevel(max(numeric_level, logging.WARNING))
+
+    # File handler
+    log_file = logs_dir / f"{datetime.now().strftime('%Y%m%d')}_{config.log_file}"
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setLevel(numeric_level)
 
-    # Avoid adding multiple handlers to the logger
-    if not getattr(logger, '_handler_set', False):
-        logger._handler_set = True  # Custom attribute to prevent re-adding handlers
+    # Console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(numeric_level)
 
-        # File handler
-        log_file = logs_dir / f"{datetime.now().strftime('%Y%m%d')}_{CONFIG['log_file']}"
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(numeric_level)
+    # Create formatter and add it to the handlers
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
 
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(numeric_level)
+    # Add handlers to the root logger; named loggers propagate to it
+    root.addHandler(file_handler)
+    root.addHandler(console_handler)
 
-        # Create formatter and add it to the handlers
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+    return root
 
-        # Add handlers to the logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
 
+def setup_logger(name: str = None) -> logging.Logger:
+    """
+    Set up and configure a logger instance.
+
+    Args:
+        name: Logger name (defaults to the root logger if None)
+
+    Returns:
+        Configured logger instance
+    """
+    _init_root()
+    logger = logging.getLogger(name)
+    if name:
+        logger.setLevel(_level())
     return logger
@@ -5,7 +5,7 @@ import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, List
 
 
 class TaskStatus(Enum):
@@ -20,13 +20,43 @@ class TaskStatus(Enum):
     PAUSED = 'Paused'
 
 
+# Statuses from which a task may be resumed
+_RESUMABLE_STATUSES = frozenset({TaskStatus.FAILED, TaskStatus.CANCELLED, TaskStatus.PAUSED})
+
+
 class TaskStats:
+    __slots__ = ('progress', 'total_bytes', 'downloaded_bytes', 'speed', 'eta', '_lock')
+
     def __init__(self):
         self.progress: float = 0.0
         self.total_bytes: int = 0
         self.downloaded_bytes: int = 0
         self.speed: float = 0.0
         self.eta: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def update_progress(self, downloaded: int, total: int):
+        """Record download progress; single attribute writes need no lock."""
+        self.downloaded_bytes = downloaded
+        self.total_bytes = total
+        if total > 0:
+            self.progress = (downloaded / total) * 100
+
+    def update(self, **kwargs):
+        """Update several fields together in a thread-safe manner."""
+        setters = _TASK_STATS_SETTERS
+        with self._lock:
+            for key, value in kwargs.items():
+                setter = setters.get(key)
+                if setter is not None:
+                    setter(self, value)
+
+
+# Slot descriptor setters for the public TaskStats fields, used by TaskStats.update
+_TASK_STATS_SETTERS = {
+    name: TaskStats.__dict__[name].__set__
+    for name in ('progress', 'total_bytes', 'downloaded_bytes', 'speed', 'eta')
+}
 
 
 class TranscriptionMetadata:
@@ -34,6 +64,7 @@ class TranscriptionMetadata:
         self.word_count: int = 0
         self.detected_language: str = ''
         self.language_probability: float = 0.0
+        self.confidence_scores: List[float] = []
         self.merged_transcript_path: Optional[str] = None
 
 
@@ -41,7 +72,8 @@ class TranscriptionTask:
     def __init__(self, url: str):
         self.id: str = str(uuid.uuid4())
         self.url: str = url
-        self.title: str = ''
+        self._title: str = ''
+        self.display_title: str = url[:50]
         self.status: TaskStatus = TaskStatus.PENDING
         self.error: Optional[str] = None
         self.created_at: datetime = datetime.now()
@@ -50,21 +82,55 @@ class TranscriptionTask:
         self.video_metadata: Dict = {}
         self.transcription_metadata: TranscriptionMetadata = TranscriptionMetadata()
         self.temp_video_path: Optional[Path] = None
-        self._lock: threading.Lock = threading.Lock()
+        # Status/error and metadata change independently, so they do not share a lock
+        self._status_lock: threading.Lock = threading.Lock()
+        self._metadata_lock: threading.Lock = threading.Lock()
+        self._revision: int = 0
+        self.on_change: Optional[Callable[[], None]] = None
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, value: str):
+        """Set the title and recompute the cached display title."""
+        self._title = value
+        self.display_title = value or self.url[:50]
+
+    @property
+    def revision(self) -> int:
+        """Counter that increases whenever displayed task state changes."""
+        return self._revision
+
+    def touch(self):
+        """
+        Mark the task as changed and notify the on_change callback, if any.
+
+        Safe to call while holding a task lock; observers only compare
+        revisions for inequality, so a lost concurrent increment is harmless.
+        The callback must not acquire the task locks.
+        """
+        self._revision += 1
+        callback = self.on_change
+        if callback is not None:
+            callback()
 
     def update_status(self, status: TaskStatus):
         """Update the status of the task in a thread-safe manner."""
-        with self._lock:
+        with self._status_lock:
             self.status = status
+            self.touch()
 
     def set_error(self, error_message: str):
         """Set an error message for the task."""
-        with self._lock:
+        with self._status_lock:
             self.error = error_message
+            self.touch()
 
     def can_resume(self) -> bool:
         """Determine if the task can be resumed based on its current status."""
-        with self._lock:
-            return self.status in {TaskStatus.FAILED, TaskStatus.CANCELLED, TaskStatus.PAUSED}
+        # A single reference read is atomic; no lock needed
+        return self.status in _RESUMABLE_STATUSES
 
     # Additional methods can be added as needed
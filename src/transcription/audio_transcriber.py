@@ -1,88 +1,384 @@
 # transcription/audio_transcriber.py
 
+import logging
+import os
 import subprocess
-import tempfile
 import httpx
-import json
+import random
 import time
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
-from threading import Lock
+from typing import AsyncIterator, Awaitable, Callable, Optional, Dict, List, Tuple
+from threading import Lock, Thread
 from datetime import datetime, timedelta
-import backoff
 import asyncio
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import hashlib
+import importlib.util
+import io
+import shutil
+import tempfile
+import weakref
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - xxhash is optional
+    xxhash = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
 
-from config.settings import CONFIG
+try:
+    import pycurl
+except ImportError:  # pragma: no cover - pycurl is optional
+    pycurl = None
+
+from config.settings import get_config
+from core.json_utils import dumps, loads
 from models.tasks import TranscriptionTask, TaskStatus
-from core.logger import setup_logger
 
-logger = setup_logger(__name__)
+logger = logging.getLogger(__name__)
+
+# FFmpeg output options that produce API-ready audio: 16 kHz mono 128 kbps MP3
+_MP3_BITRATE = 128_000
+_MP3_ENCODE_ARGS = (
+    '-vn',
+    '-acodec', 'libmp3lame',
+    '-ar', '16000',
+    '-ac', '1',
+    '-b:a', f'{_MP3_BITRATE // 1000}k',
+    '-filter:a', 'volume=1.0,highpass=f=40,lowpass=f=7000',  # Audio filtering
+    '-map_metadata', '-1',
+)
+
+# Longest chunk the API accepts, and the share of the size limit a chunk aims for
+_MAX_SEGMENT_SEC = 1500
+_SEGMENT_SIZE_HEADROOM = 0.9
+
+# Preprocessing cache keys hash the source content in blocks of this size
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+# Without fcntl, partial encodes this old are assumed to belong to a crashed worker
+_STALE_PART_SEC = 3600
+
+# MP3 files start with an ID3 tag or an MPEG frame sync (11 set bits)
+_ID3_MAGIC = b'ID3'
+
+# Responses worth retrying: rate limiting and transient server errors
+_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+_MAX_BACKOFF_SEC = 30
+
+# HTTP/2 multiplexes concurrent uploads over one connection when h2 is installed
+_HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Upload bodies are streamed from disk in blocks of this size
+_UPLOAD_BLOCK_SIZE = 256 * 1024
+
+# Chunk JSON files read ahead of the merge writer
+_MERGE_READ_AHEAD = 8
+
+# Merged segments are held in memory up to this size, then spooled to disk
+_MERGE_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def _load_chunk_json(json_file: Path) -> Dict:
+    """Read one chunk transcription file."""
+    with open(json_file, 'rb') as f:
+        return loads(f.read())
+
+
+async def _stream_upload(path: Path, head: bytes, tail: bytes) -> AsyncIterator[bytes]:
+    """Yield a multipart upload body, reading the file in blocks off the event loop."""
+    yield head
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        while block := await asyncio.to_thread(f.read, _UPLOAD_BLOCK_SIZE):
+            yield block
+    finally:
+        f.close()
+    yield tail
+
 
 class RateLimit:
-    """Rate limit tracker."""
+    """
+    Token-bucket rate limiter that also follows the API's rate-limit headers.
+
+    The bucket holds up to max_requests tokens and refills at
+    max_requests per window_seconds, so short bursts are allowed while the
+    long-run rate stays under the limit.
+    """
     def __init__(self, window_seconds: int, max_requests: int):
         self.window_seconds = window_seconds
         self.max_requests = max_requests
-        self.requests: List[datetime] = []
+        self.rate = max_requests / window_seconds
+        self.tokens = float(max_requests)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
         self.lock = Lock()
 
     def can_request(self) -> Tuple[bool, float]:
         """Check if request is allowed and return wait time if not."""
-        now = datetime.now()
+        now = time.monotonic()
         with self.lock:
-            # Remove old requests
-            self.requests = [t for t in self.requests 
-                           if (now - t).total_seconds() < self.window_seconds]
-            
-            if len(self.requests) < self.max_requests:
-                self.requests.append(now)
+            if now < self.blocked_until:
+                return False, self.blocked_until - now
+
+            self.tokens = min(self.max_requests, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
                 return True, 0
-            
+
             # Calculate wait time
-            oldest = self.requests[0]
-            wait_time = self.window_seconds - (now - oldest).total_seconds()
-            return False, max(0, wait_time)
+            return False, (1 - self.tokens) / self.rate
+
+    def observe(self, headers) -> None:
+        """Shrink the bucket to the API's remaining quota and honor Retry-After."""
+        remaining = headers.get('x-ratelimit-remaining-requests')
+        retry_after = headers.get('retry-after')
+        now = time.monotonic()
+        with self.lock:
+            if remaining is not None:
+                try:
+                    self.tokens = min(self.tokens, float(remaining))
+                except ValueError:
+                    pass
+            if retry_after:
+                try:
+                    self.blocked_until = max(self.blocked_until, now + float(retry_after))
+                except ValueError:
+                    pass
 
 class AudioTranscriber:
     """Enhanced audio transcription using Groq API with advanced features."""
 
     def __init__(self):
+        config = get_config()
+
         # Existing configuration
-        self.api_key = CONFIG.get('api_key', '')
-        self.api_url = CONFIG['transcription'].get('api_url', '')
-        self.model = CONFIG['transcription'].get('model', 'whisper-large-v3')
-        self.language = CONFIG['transcription'].get('language', None)
+        self.api_key = config.api_key or ''
+        self.api_url = config.transcription.api_url
+        self.model = config.transcription.model
+        self.language = config.transcription.language
+        self.response_format = config.transcription.response_format
+        self.temperature = config.transcription.temperature
+        self.timestamp_granularities = config.transcription.timestamp_granularities
+
+        # Form fields shared by every upload; only the file part varies per chunk
+        self._static_form = [
+            ('model', (None, self.model)),
+            ('response_format', (None, self.response_format)),
+            ('temperature', (None, self.temperature)),
+        ]
+        if self.language:
+            self._static_form.append(('language', (None, self.language)))
+        if self.response_format == 'verbose_json':
+            self._static_form.extend(
+                ('timestamp_granularities[]', (None, granularity))
+                for granularity in self.timestamp_granularities
+            )
+        self._headers = {'Authorization': f"Bearer {self.api_key}"}
         
         # API settings
-        self.max_retries = CONFIG.get('max_retries', 3)
-        self.retry_delay = CONFIG.get('retry_delay', 30)
-        self.api_timeout = CONFIG.get('api_timeout', 300)
+        self.max_retries = config.max_retries
+        self.retry_delay = config.api_retry_delay
+        self.api_timeout = config.api_timeout
         
         # Enhanced settings
-        self.max_chunk_size = 25 * 1024 * 1024  # 25MB
-        self.max_workers = CONFIG.get('max_workers', 3)
-        self.cache_dir = Path(CONFIG.get('cache_dir', 'cache'))
+        self.max_chunk_size = config.chunk_max_size_bytes  # 25MB
+        self.max_workers = config.max_workers
+        self.max_concurrency = config.transcription.max_concurrency
+        self.chunk_duration_sec = config.chunk_duration_sec
+        self.verify_output = config.transcription.verify_output
+        self.keep_chunk_txt = config.transcription.keep_chunk_txt
+        self.use_pycurl = config.transcription.http_backend == 'pycurl'
+        if self.use_pycurl and pycurl is None:
+            logger.warning("TRANSCRIPTION_HTTP_BACKEND=pycurl but pycurl is not installed; using httpx")
+            self.use_pycurl = False
+        self.cache_dir = config.cache_dir
         self.cache_dir.mkdir(exist_ok=True)
+
+        self.cache_max_bytes = config.cache_max_bytes
+        self.cache_max_age = config.cache_max_age_days * 86400
+        self._evict_lock = Lock()
+
+        # (path, mtime_ns, size) -> content digest, so unchanged files are not rehashed.
+        # The index is an append-only log; stale and duplicate lines are dropped on load.
+        self._meta_cache_path = self.cache_dir / "meta.jsonl"
+        self._meta_cache: Dict[str, str] = self._load_meta_cache()
         
         # Rate limiting
         self.rate_limiter = RateLimit(
-            window_seconds=CONFIG.get('rate_limit_window', 60),
-            max_requests=CONFIG.get('rate_limit_requests', 50)
+            window_seconds=config.rate_limit_window,
+            max_requests=config.rate_limit_requests
         )
         
+        # Shared upload client, bound to the event loop that created it
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # FFmpeg/ffprobe children are CPU-bound; run at most one per core at a time
+        self._media_slots = asyncio.Semaphore(os.cpu_count() or 1)
+
+        # One coroutine per cache entry waits on its flock, so blocked waiters
+        # can never fill the executor the lock holder needs to finish
+        self._entry_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+        # One long-lived event loop serves every sync call, so the client and
+        # its connections survive from one task to the next
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = Thread(target=self._loop.run_forever, name="TranscriberLoop", daemon=True)
+        self._loop_thread.start()
+
         self.lock = Lock()
-        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _load_meta_cache(self) -> Dict[str, str]:
+        """
+        Load the persisted file-metadata to content-digest map.
+
+        Entries whose file is gone or has changed since it was hashed are
+        pruned, and the log is compacted when anything was dropped.
+        """
+        try:
+            with open(self._meta_cache_path, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            logger.warning("Ignoring unreadable cache index %s: %s", self._meta_cache_path, e)
+            return {}
+
+        meta_cache = {}
+        for line in lines:
+            try:
+                meta_key, digest = loads(line)
+            except ValueError:
+                continue  # A torn final line from an interrupted append
+            meta_cache[meta_key] = digest
+
+        fresh = {}
+        for meta_key, digest in meta_cache.items():
+            path, mtime_ns, size = meta_key.rsplit('|', 2)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if st.st_mtime_ns == int(mtime_ns) and st.st_size == int(size):
+                fresh[meta_key] = digest
+
+        if len(fresh) != len(lines):
+            tmp_path = self._meta_cache_path.with_suffix('.tmp')
+            try:
+                tmp_path.write_bytes(b''.join(dumps(item) + b'\n' for item in fresh.items()))
+                os.replace(tmp_path, self._meta_cache_path)
+            except OSError as e:
+                logger.warning("Failed to compact cache index: %s", e)
+        return fresh
+
+    def _content_key(self, audio_path: Path) -> str:
+        """
+        Hash the file content together with the encoder settings.
+
+        The digest of a file is remembered by path, mtime and size, so a file
+        is only read again after it changes.
+        """
+        st = audio_path.stat()
+        meta_key = f"{audio_path}|{st.st_mtime_ns}|{st.st_size}"
+        with self.lock:
+            digest = self._meta_cache.get(meta_key)
+        if digest is not None:
+            return digest
+
+        hasher = xxhash.xxh3_64() if xxhash is not None else hashlib.blake2b(digest_size=8)
+        hasher.update(repr(_MP3_ENCODE_ARGS).encode())
+        with open(audio_path, 'rb') as f:
+            while block := f.read(_HASH_BLOCK_SIZE):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+
+        # Append one line rather than rewriting the whole index
+        line = dumps([meta_key, digest]) + b'\n'
+        with self.lock:
+            self._meta_cache[meta_key] = digest
+            try:
+                with open(self._meta_cache_path, 'ab') as f:
+                    f.write(line)
+            except OSError as e:
+                logger.warning("Failed to save cache index: %s", e)
+        return digest
+
+    def _touch_cache_entry(self, cache_path: Path) -> None:
+        """Mark a cache entry as recently used for LRU eviction."""
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+
+    def _evict_cache(self, keep: Path) -> None:
+        """
+        Evict cache entries unused for longer than cache_max_age, then the
+        least recently used ones until the cache fits in cache_max_bytes.
+
+        keep, the entry just stored, is never evicted. Runs are skipped while
+        another thread is already evicting.
+        """
+        if not self.cache_max_bytes and not self.cache_max_age:
+            return
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            entries = []
+            sidecars = []
+            total = 0
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(('.lock', '.mp3.part')):
+                        sidecars.append(entry.name)
+                    if not entry.name.endswith('.mp3') or entry.name == keep.name:
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+            try:
+                total += keep.stat().st_size
+            except OSError:
+                pass
+
+            entries.sort()
+            cutoff = time.time() - self.cache_max_age if self.cache_max_age else None
+            evicted = 0
+            for mtime, size, path in entries:
+                expired = cutoff is not None and mtime < cutoff
+                if not expired and (not self.cache_max_bytes or total <= self.cache_max_bytes):
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning("Failed to evict cache entry %s: %s", path, e)
+                    continue
+                total -= size
+                evicted += 1
+            if evicted:
+                logger.debug("Evicted %d cache entries, %d bytes remain", evicted, total)
+            self._remove_stale_sidecars(sidecars)
+        finally:
+            self._evict_lock.release()
 
     def get_cache_path(self, audio_path: Path) -> Path:
-        """Generate cache path for processed audio."""
-        hash_str = hashlib.sha256(str(audio_path).encode()).hexdigest()[:12]
-        return self.cache_dir / f"{hash_str}_{audio_path.stem}.mp3"
+        """Generate a content-addressed cache path for processed audio."""
+        return self.cache_dir / f"{self._content_key(audio_path)}.mp3"
 
-    def verify_audio(self, file_path: Path) -> Dict:
-        """Verify audio file format and get metadata."""
-        cmd = [
+    def _probe_command(self, file_path: Path) -> List[str]:
+        """Build the ffprobe command that reports format and streams as JSON."""
+        return [
             'ffprobe',
             '-v', 'quiet',
             '-print_format', 'json',
@@ -90,170 +386,651 @@ class AudioTranscriber:
             '-show_streams',
             str(file_path)
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+
+    def verify_audio(self, file_path: Path) -> Dict:
+        """Verify audio file format and get metadata."""
+        cmd = self._probe_command(file_path)
+        # ffprobe runs with -v quiet, so there is no stderr worth capturing
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
         if result.returncode != 0:
-            raise RuntimeError(f"FFprobe failed: {result.stderr}")
-        return json.loads(result.stdout)
+            raise RuntimeError(f"FFprobe failed with exit code {result.returncode}")
+        return loads(result.stdout)
+
+    async def verify_audio_async(self, file_path: Path) -> Dict:
+        """Async version of verify_audio, bounded by the media process slots."""
+        async with self._media_slots:
+            proc = await asyncio.create_subprocess_exec(
+                *self._probe_command(file_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"FFprobe failed with exit code {proc.returncode}")
+        return loads(stdout)
+
+    def is_mp3_file(self, file_path: Path) -> bool:
+        """Cheap check that a file begins like an MP3 stream, without spawning ffprobe."""
+        with open(file_path, 'rb') as f:
+            header = f.read(10)
+        if header.startswith(_ID3_MAGIC):
+            return True
+        return len(header) >= 2 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0
+
+    def _lock_cache_entry(self, cache_path: Path, blocking: bool = True) -> Optional[int]:
+        """
+        Take the lock for a cache entry, blocking until this process holds it.
+
+        Workers preprocessing identical content coalesce on one encode. The
+        lock file is unlinked on release, so after flock succeeds the path is
+        checked to still name the locked file, and the lock is retaken if it
+        was removed meanwhile. Returns the lock file descriptor, or None where
+        fcntl is unavailable or, when not blocking, the entry is busy.
+        """
+        if fcntl is None:
+            return None
+        lock_path = cache_path.with_suffix('.lock')
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        while True:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, flags)
+            except BlockingIOError:
+                os.close(fd)
+                return None
+            try:
+                if os.stat(lock_path).st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def _unlock_cache_entry(self, fd: Optional[int], cache_path: Path) -> None:
+        """Remove and release a lock taken by _lock_cache_entry."""
+        if fd is not None:
+            try:
+                os.unlink(cache_path.with_suffix('.lock'))
+            except FileNotFoundError:
+                pass
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _remove_stale_sidecars(self, names: List[str]) -> None:
+        """
+        Remove .lock and .mp3.part files left behind by crashed workers.
+
+        A sidecar is only stale when nobody holds its entry lock; without
+        fcntl, partial encodes older than _STALE_PART_SEC are removed instead.
+        """
+        cutoff = time.time() - _STALE_PART_SEC
+        for digest in {name.split('.', 1)[0] for name in names}:
+            cache_path = self.cache_dir / f"{digest}.mp3"
+            part_path = cache_path.with_suffix('.mp3.part')
+            if fcntl is None:
+                try:
+                    if part_path.stat().st_mtime < cutoff:
+                        part_path.unlink()
+                except FileNotFoundError:
+                    pass
+                continue
+            fd = self._lock_cache_entry(cache_path, blocking=False)
+            if fd is None:
+                continue
+            try:
+                part_path.unlink(missing_ok=True)
+            finally:
+                self._unlock_cache_entry(fd, cache_path)
+
+    def _preprocess_command(self, audio_path: Path, temp_path: Path) -> List[str]:
+        """Build the FFmpeg command that encodes audio_path into temp_path."""
+        # Enhanced FFmpeg settings for better quality; the .part name needs an explicit format
+        return [
+            'ffmpeg', '-y', '-v', 'error',
+            '-i', str(audio_path),
+            *_MP3_ENCODE_ARGS,
+            '-f', 'mp3',
+            str(temp_path)
+        ]
+
+    def _store_preprocessed(self, temp_path: Path, cache_path: Path) -> Path:
+        """Validate freshly encoded audio and move it into the cache."""
+        # Verify
+        size = temp_path.stat().st_size if temp_path.exists() else 0
+        if size == 0:
+            raise RuntimeError("Failed to create audio file")
+
+        # We wrote the file with known parameters, so only run ffprobe when
+        # asked to or when its output would actually be logged
+        if self.verify_output or logger.isEnabledFor(logging.DEBUG):
+            audio_info = self.verify_audio(temp_path)
+            logger.debug("Audio info: %s", audio_info)
+        elif not self.is_mp3_file(temp_path):
+            raise RuntimeError("FFmpeg output is not an MP3 file")
+
+        # Cache the file if it's valid
+        if size > self.max_chunk_size:
+            raise ValueError("Audio file too large")
+        os.replace(temp_path, cache_path)
+        self._evict_cache(keep=cache_path)
+        return cache_path
+
+    async def _needs_preprocessing(self, audio_path: Path) -> bool:
+        """
+        Check whether a file must be re-encoded before upload.
+
+        Only MP3 files within the size limit are probed; anything else is
+        re-encoded without spawning ffprobe.
+        """
+        try:
+            if audio_path.suffix.lower() != '.mp3':
+                return True
+            if (await asyncio.to_thread(audio_path.stat)).st_size > self.max_chunk_size:
+                return True
+            streams = (await self.verify_audio_async(audio_path)).get('streams', [])
+            stream = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+            return (
+                stream is None
+                or stream.get('codec_name') != 'mp3'
+                or int(stream.get('sample_rate', 0)) != 16000
+                or stream.get('channels') != 1
+            )
+        except Exception as e:
+            logger.debug("Could not inspect %s, preprocessing it: %s", audio_path, e)
+            return True
 
     def preprocess_audio(self, audio_path: Path, task: TranscriptionTask) -> Optional[Path]:
         """Enhanced audio preprocessing with caching."""
+        temp_path = None
+        lock = None
         try:
             cache_path = self.get_cache_path(audio_path)
             if cache_path.exists():
-                logger.info(f"Using cached audio: {cache_path}")
+                logger.info("Using cached audio: %s", cache_path)
+                self._touch_cache_entry(cache_path)
                 return cache_path
 
-            temp_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-            temp_path = Path(temp_file.name)
-            temp_file.close()
-
-            # Enhanced FFmpeg settings for better quality
-            cmd = [
-                'ffmpeg', '-y',
-                '-i', str(audio_path),
-                '-vn',                    
-                '-acodec', 'libmp3lame',
-                '-ar', '16000',          
-                '-ac', '1',              
-                '-b:a', '128k',
-                '-filter:a', 'volume=1.0,highpass=f=40,lowpass=f=7000',  # Audio filtering
-                '-map_metadata', '-1',
-                str(temp_path)
-            ]
+            # Another worker may have encoded the same content while we waited
+            lock = self._lock_cache_entry(cache_path)
+            if cache_path.exists():
+                logger.info("Using cached audio: %s", cache_path)
+                self._touch_cache_entry(cache_path)
+                return cache_path
 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+            # Encode next to the cache so the final os.replace stays on one filesystem
+            temp_path = cache_path.with_suffix('.mp3.part')
+            cmd = self._preprocess_command(audio_path, temp_path)
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=120)
             if result.returncode != 0:
-                raise RuntimeError(f"FFmpeg failed: {result.stderr}")
+                raise RuntimeError(f"FFmpeg failed: {result.stderr.decode('utf-8', errors='replace')}")
 
-            # Verify
-            if not temp_path.exists() or temp_path.stat().st_size == 0:
-                raise RuntimeError("Failed to create audio file")
+            return self._store_preprocessed(temp_path, cache_path)
 
-            # Get audio info - Fixed variable name in logging
-            audio_info = self.verify_audio(temp_path)
-            logger.debug(f"Audio info: {audio_info}")  # Fixed from json_info to audio_info
+        except Exception as e:
+            logger.error("Task %s: Audio preprocessing failed: %s", task.id, e)
+            if temp_path is not None and temp_path.exists():
+                temp_path.unlink()
+            return None
+
+        finally:
+            if lock is not None:
+                self._unlock_cache_entry(lock, cache_path)
+
+    async def preprocess_audio_async(self, audio_path: Path, task: TranscriptionTask) -> Optional[Path]:
+        """
+        Async version of preprocess_audio.
 
-            # Cache the file if it's valid
-            if temp_path.stat().st_size <= self.max_chunk_size:
-                temp_path.rename(cache_path)
+        FFmpeg runs as an asyncio subprocess, so waiting on it does not tie up
+        a thread; hashing and file checks still run in worker threads.
+        """
+        temp_path = None
+        lock = None
+        try:
+            cache_path = await asyncio.to_thread(self.get_cache_path, audio_path)
+            if cache_path.exists():
+                logger.info("Using cached audio: %s", cache_path)
+                self._touch_cache_entry(cache_path)
                 return cache_path
-            else:
-                raise ValueError("Audio file too large")
+
+            entry_lock = self._entry_locks.get(cache_path.name)
+            if entry_lock is None:
+                entry_lock = self._entry_locks[cache_path.name] = asyncio.Lock()
+
+            async with entry_lock:
+                try:
+                    # Another worker may have encoded the same content while we waited
+                    lock = await asyncio.to_thread(self._lock_cache_entry, cache_path)
+                    if cache_path.exists():
+                        logger.info("Using cached audio: %s", cache_path)
+                        self._touch_cache_entry(cache_path)
+                        return cache_path
+
+                    # Encode next to the cache so the final os.replace stays on one filesystem
+                    temp_path = cache_path.with_suffix('.mp3.part')
+                    async with self._media_slots:
+                        proc = await asyncio.create_subprocess_exec(
+                            *self._preprocess_command(audio_path, temp_path),
+                            stdout=asyncio.subprocess.DEVNULL,
+                            stderr=asyncio.subprocess.PIPE
+                        )
+                        try:
+                            _, stderr = await asyncio.wait_for(proc.communicate(), timeout=120)
+                        except asyncio.TimeoutError:
+                            proc.kill()
+                            await proc.wait()
+                            raise RuntimeError("FFmpeg timed out")
+                    if proc.returncode != 0:
+                        raise RuntimeError(f"FFmpeg failed: {stderr.decode('utf-8', errors='replace')}")
+
+                    return await asyncio.to_thread(self._store_preprocessed, temp_path, cache_path)
+                except Exception:
+                    # Remove the partial encode while still holding the entry
+                    if temp_path is not None and temp_path.exists():
+                        temp_path.unlink()
+                    raise
+                finally:
+                    # Release the flock before the next coroutine for this entry wakes up
+                    self._unlock_cache_entry(lock, cache_path)
 
         except Exception as e:
-            logger.error(f"Task {task.id}: Audio preprocessing failed: {str(e)}")
-            if temp_path.exists():
-                temp_path.unlink()
+            logger.error("Task %s: Audio preprocessing failed: %s", task.id, e)
             return None
 
-    @backoff.on_exception(
-        backoff.expo,
-        (httpx.HTTPError, RuntimeError),
-        max_tries=3,
-        max_time=300
-    )
-    async def transcribe_chunk_async(self, chunk_path: Path, task: TranscriptionTask) -> bool:
-        """Async version of chunk transcription."""
-        temp_file = None
+    def target_segment_seconds(self) -> int:
+        """Longest segment whose constant-bitrate MP3 stays under the upload limit."""
+        seconds = int(self.max_chunk_size * _SEGMENT_SIZE_HEADROOM * 8 / _MP3_BITRATE)
+        return max(1, min(seconds, _MAX_SEGMENT_SEC))
+
+    def prepare_chunks(self, task: TranscriptionTask, segment_seconds: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Encode the source audio into API-ready MP3 chunks with a single FFmpeg pass.
+
+        Replaces splitting followed by per-chunk preprocessing: the segment muxer
+        decodes the source once and writes every chunk already in upload format.
+
+        Args:
+            task (TranscriptionTask): Task whose temp_video_path holds the source audio.
+            segment_seconds (Optional[int]): Chunk length; defaults to the longest
+                duration whose constant-bitrate output fits the upload limit.
+
+        Returns:
+            Optional[List[Dict]]: Chunk information, or None if encoding failed.
+        """
+        try:
+            with task._metadata_lock:
+                video_dir = Path(task.metadata.get('video_dir', ''))
+                source_path = task.temp_video_path
+            if not source_path or not source_path.exists():
+                raise FileNotFoundError(f"Audio file not found: {source_path}")
+
+            chunks_dir = video_dir / "chunks"
+            chunks_dir.mkdir(parents=True, exist_ok=True)
+
+            total_duration = float(self.verify_audio(source_path)['format']['duration'])
+            segment_seconds = segment_seconds or self.target_segment_seconds()
+            logger.info("Task %s: Using %ss segments", task.id, segment_seconds)
+            segment_list = chunks_dir / "segments.csv"
+
+            while True:
+                with os.scandir(chunks_dir) as it:
+                    for entry in it:
+                        if entry.name.startswith("chunk_") and entry.name.endswith(".mp3"):
+                            os.unlink(entry.path)
+
+                cmd = [
+                    'ffmpeg', '-y', '-v', 'error',
+                    '-i', str(source_path),
+                    *_MP3_ENCODE_ARGS,
+                    '-f', 'segment',
+                    '-segment_time', str(segment_seconds),
+                    '-reset_timestamps', '1',
+                    '-segment_list', str(segment_list),
+                    '-segment_list_type', 'csv',
+                    str(chunks_dir / "chunk_%03d.mp3")
+                ]
+                result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                if result.returncode != 0:
+                    raise RuntimeError(f"FFmpeg failed: {result.stderr.decode('utf-8', errors='replace')}")
+
+                # One directory scan gives every chunk's name and size
+                with os.scandir(chunks_dir) as it:
+                    entries = sorted(
+                        (entry for entry in it if entry.name.startswith("chunk_") and entry.name.endswith(".mp3")),
+                        key=lambda entry: entry.name,
+                    )
+                if not entries:
+                    raise RuntimeError("No chunks were created")
+
+                # Re-run with shorter segments if any chunk is over the upload limit
+                largest = max(entry.stat().st_size for entry in entries)
+                if largest <= self.max_chunk_size:
+                    break
+                if segment_seconds <= 1:
+                    raise ValueError("Audio chunk too large")
+                segment_seconds = max(1, int(segment_seconds * self.max_chunk_size / largest * 0.9))
+                logger.warning("Task %s: Chunk of %d bytes exceeds limit, retrying with %ds segments",
+                               task.id, largest, segment_seconds)
+
+            # The segment list records the actual start/end of every chunk
+            with open(segment_list, 'r', encoding='utf-8') as f:
+                bounds = {
+                    Path(name).name: (float(start) * 1000, float(end) * 1000)
+                    for name, start, end in (line.strip().rsplit(',', 2) for line in f if line.strip())
+                }
+            segment_list.unlink()
+
+            chunks = []
+            for index, entry in enumerate(entries):
+                chunk_path = Path(entry.path)
+                start_ms, end_ms = bounds.get(entry.name, (
+                    index * segment_seconds * 1000,
+                    min((index + 1) * segment_seconds, total_duration) * 1000,
+                ))
+                chunks.append({
+                    "chunk_index": index,
+                    "filename": str(chunk_path.absolute()),
+                    "relative_path": chunk_path.name,
+                    "duration_ms": end_ms - start_ms,
+                    "start_ms": start_ms,
+                    "end_ms": end_ms,
+                    "audio_format": "mp3",
+                })
+
+            manifest = {
+                "total_chunks": len(chunks),
+                "total_duration_ms": total_duration * 1000,
+                "chunks": chunks,
+                "chunks_directory": str(chunks_dir.absolute()),
+                "created_at": datetime.now().isoformat(),
+                "preprocessed": True,
+            }
+
+            with open(chunks_dir / "chunks_manifest.json", "wb") as f:
+                f.write(dumps(manifest, pretty=True))
+
+            with task._metadata_lock:
+                task.metadata['chunks_dir'] = str(chunks_dir)
+                task.metadata["chunks_info"] = manifest
+
+            logger.info("Task %s: Encoded %d API-ready chunks of %ss", task.id, len(chunks), segment_seconds)
+            return chunks
+
+        except Exception as e:
+            logger.exception("Task %s: Failed to prepare chunks: %s", task.id, e)
+            return None
+
+    def _multipart_envelope(self, upload_path: Path) -> Tuple[bytes, bytes, str]:
+        """
+        Build the multipart form around an upload file.
+
+        Returns the bytes sent before and after the file content, and the
+        matching Content-Type header value.
+        """
+        boundary = os.urandom(16).hex()
+        parts = [
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, (_, value) in self._static_form
+        ]
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+            f'filename="{upload_path.name}"\r\nContent-Type: application/octet-stream\r\n\r\n'
+        )
+        head = ''.join(parts).encode('utf-8')
+        tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        return head, tail, f'multipart/form-data; boundary={boundary}'
+
+    async def _send_httpx(self, client: httpx.AsyncClient, upload_path: Path) -> httpx.Response:
+        """
+        Send one upload attempt through httpx.
+
+        The response is streamed so the body is only read when the caller
+        needs it; retried responses are discarded unread.
+        """
+        # The body is read from disk block by block in _stream_upload
+        upload_size = (await asyncio.to_thread(upload_path.stat)).st_size
+        head, tail, content_type = self._multipart_envelope(upload_path)
+        headers = {
+            **self._headers,
+            'Content-Type': content_type,
+            'Content-Length': str(len(head) + upload_size + len(tail)),
+        }
+        request = client.build_request(
+            'POST',
+            self.api_url,
+            headers=headers,
+            content=_stream_upload(upload_path, head, tail),
+            timeout=self.api_timeout
+        )
+        return await client.send(request, stream=True)
+
+    def _send_pycurl(self, upload_path: Path) -> httpx.Response:
+        """
+        Send one upload attempt through libcurl; runs in a worker thread.
+
+        libcurl builds the multipart body and reads the file itself. The
+        result is wrapped in an httpx.Response so callers handle both
+        backends the same way.
+        """
+        body = io.BytesIO()
+        headers: Dict[str, str] = {}
+
+        def header_line(line: bytes) -> None:
+            name, sep, value = line.decode('iso-8859-1').partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        request = httpx.Request('POST', self.api_url)
+        curl = pycurl.Curl()
         try:
+            curl.setopt(pycurl.URL, self.api_url)
+            curl.setopt(pycurl.HTTPHEADER, [f"{k}: {v}" for k, v in self._headers.items()])
+            curl.setopt(pycurl.HTTPPOST, [
+                *((name, value) for name, (_, value) in self._static_form),
+                ('file', (pycurl.FORM_FILE, str(upload_path),
+                          pycurl.FORM_CONTENTTYPE, 'application/octet-stream')),
+            ])
+            curl.setopt(pycurl.TIMEOUT, self.api_timeout)
+            curl.setopt(pycurl.WRITEDATA, body)
+            curl.setopt(pycurl.HEADERFUNCTION, header_line)
+            try:
+                curl.perform()
+            except pycurl.error as e:
+                # Map to httpx transport errors so _post_with_retry treats both backends alike
+                if e.args and e.args[0] == pycurl.E_OPERATION_TIMEDOUT:
+                    raise httpx.ReadTimeout(str(e), request=request) from e
+                if e.args and e.args[0] in (pycurl.E_COULDNT_CONNECT, pycurl.E_COULDNT_RESOLVE_HOST):
+                    raise httpx.ConnectError(str(e), request=request) from e
+                raise httpx.NetworkError(str(e), request=request) from e
+            status = curl.getinfo(pycurl.RESPONSE_CODE)
+        finally:
+            curl.close()
+
+        return httpx.Response(status, headers=headers, content=body.getvalue(), request=request)
+
+    async def _post_with_retry(self, send: Callable[[], Awaitable[httpx.Response]],
+                               max_attempts: Optional[int] = None) -> httpx.Response:
+        """
+        POST a chunk to the API, retrying rate limits, server errors and
+        transport failures (timeouts, refused connections, dropped streams).
+
+        Honors the Retry-After header when present, otherwise backs off
+        exponentially with jitter. send performs one attempt and is called
+        again for every retry, so each retry uploads the file from the start.
+        max_attempts defaults to the max_retries setting.
+        """
+        max_attempts = max(1, max_attempts or self.max_retries)
+        for attempt in range(max_attempts):
+            last_attempt = attempt == max_attempts - 1
+            delay = min(2 ** attempt + random.random(), _MAX_BACKOFF_SEC)
+            try:
+                response = await send()
+                self.rate_limiter.observe(response.headers)
+                if response.status_code not in _RETRY_STATUS or last_attempt:
+                    await response.aread()
+                    return response
+                await response.aclose()
+            except httpx.TransportError as e:
+                # Covers timeouts, connect errors and HTTP/2 resets on either backend
+                if last_attempt:
+                    raise
+                logger.warning("API transport error (%s) - retrying in %.1fs", type(e).__name__, delay)
+            else:
+                retry_after = response.headers.get('Retry-After')
+                if retry_after:
+                    try:
+                        delay = float(retry_after)
+                    except ValueError:
+                        delay = self.retry_delay
+                elif response.status_code == 429:
+                    delay = self.retry_delay
+                logger.warning("API returned %s - retrying in %.1fs", response.status_code, delay)
+
+            await asyncio.sleep(delay)
+
+    async def _prepare_upload(self, chunk_path: Path, task: TranscriptionTask) -> Optional[Path]:
+        """Return the file to upload for a chunk, preprocessing it if needed."""
+        if task.metadata.get('chunks_info', {}).get('preprocessed'):
+            # Chunks from prepare_chunks are already in upload format
+            if (await asyncio.to_thread(chunk_path.stat)).st_size > self.max_chunk_size:
+                logger.error("Task %s: Chunk too large for upload: %s", task.id, chunk_path.name)
+                return None
+            return chunk_path
+        if not await self._needs_preprocessing(chunk_path):
+            return chunk_path
+        return await self.preprocess_audio_async(chunk_path, task)
+
+    def _save_chunk_result(self, transcripts_dir: Path, base_name: str,
+                           transcription_data: Dict, text: str) -> None:
+        """Write a chunk's transcription files; runs in a worker thread."""
+        json_path = transcripts_dir / f"{base_name}.json"
+        with open(json_path, 'wb') as f:
+            f.write(dumps(transcription_data, pretty=True))
+
+        # merge_transcripts reads the JSON; the plain-text copy is optional
+        if self.keep_chunk_txt:
+            with open(transcripts_dir / f"{base_name}.txt", 'w', encoding='utf-8') as f:
+                f.write(text)
+
+    async def transcribe_chunk_async(self, chunk_path: Path, task: TranscriptionTask,
+                                     client: httpx.AsyncClient,
+                                     upload_path: Optional[Path] = None) -> bool:
+        """
+        Async version of chunk transcription using a shared client.
+
+        upload_path is the already prepared upload file; when omitted the chunk
+        is prepared here.
+        """
+        try:
+            if upload_path is None:
+                upload_path = await self._prepare_upload(chunk_path, task)
+                if not upload_path:
+                    return False
+
             # Check rate limit
-            can_request, wait_time = self.rate_limiter.can_request()
-            if not can_request:
-                logger.info(f"Rate limit - waiting {wait_time}s")
+            while True:
+                can_request, wait_time = self.rate_limiter.can_request()
+                if can_request:
+                    break
+                logger.info("Rate limit - waiting %.1fs", wait_time)
                 await asyncio.sleep(wait_time)
 
-            # Preprocess
-            temp_file = self.preprocess_audio(chunk_path, task)
-            if not temp_file:
-                return False
+            if self.use_pycurl:
+                send = partial(asyncio.to_thread, self._send_pycurl, upload_path)
+            else:
+                send = partial(self._send_httpx, client, upload_path)
 
-            headers = {'Authorization': f"Bearer {self.api_key}"}
+            response = await self._post_with_retry(send)
+            response.raise_for_status()
+            result = loads(response.content)
+
+            # Save results
+            transcripts_dir = Path(task.metadata['transcripts_dir'])
+            base_name = chunk_path.stem
             
-            async with httpx.AsyncClient() as client:
-                with open(temp_file, 'rb') as f:
-                    files = [
-                        ('file', (temp_file.name, f, 'application/octet-stream')),
-                        ('model', (None, self.model)),
-                        ('response_format', (None, 'json'))
-                    ]
-                    
-                    if self.language:
-                        files.append(('language', (None, self.language)))
-
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=self.api_timeout
-                    )
+            # Save with enhanced metadata
+            transcription_data = {
+                'transcription': result,
+                'metadata': {
+                    'chunk_path': str(chunk_path),
+                    'processed_at': datetime.now().isoformat(),
+                    'model': self.model,
+                    'language': result.get('language', self.language),
+                    'confidence': result.get('confidence', None)
+                }
+            }
+
+            text = result.get('text', '')
+            await asyncio.to_thread(
+                self._save_chunk_result, transcripts_dir, base_name, transcription_data, text
+            )
+
+            # Compute outside the lock so concurrent chunks only contend on the update
+            word_count = len(text.split())
+            language = result.get('language', self.language)
+            confidence = result.get('confidence')
+            tm = task.transcription_metadata
 
-                    if response.status_code == 429:
-                        retry_after = int(response.headers.get('Retry-After', self.retry_delay))
-                        raise RuntimeError(f"Rate limit exceeded - retry after {retry_after}s")
-
-                    response.raise_for_status()
-                    result = response.json()
-
-                    # Save results
-                    transcripts_dir = Path(task.metadata['transcripts_dir'])
-                    base_name = chunk_path.stem
-                    
-                    # Save with enhanced metadata
-                    transcription_data = {
-                        'transcription': result,
-                        'metadata': {
-                            'chunk_path': str(chunk_path),
-                            'processed_at': datetime.now().isoformat(),
-                            'model': self.model,
-                            'language': result.get('language', self.language),
-                            'confidence': result.get('confidence', None)
-                        }
-                    }
-
-                    json_path = transcripts_dir / f"{base_name}.json"
-                    text_path = transcripts_dir / f"{base_name}.txt"
-
-                    with open(json_path, 'w', encoding='utf-8') as f:
-                        json.dump(transcription_data, f, indent=2)
-
-                    with open(text_path, 'w', encoding='utf-8') as f:
-                        f.write(result.get('text', ''))
-
-                    # Update task metadata
-                    with task._lock:
-                        task.transcription_metadata.word_count += len(result.get('text', '').split())
-                        task.transcription_metadata.detected_language = result.get('language', 
-                                                                                self.language)
-                        # Add confidence scores if available
-                        if 'confidence' in result:
-                            if not hasattr(task.transcription_metadata, 'confidence_scores'):
-                                task.transcription_metadata.confidence_scores = []
-                            task.transcription_metadata.confidence_scores.append(result['confidence'])
-
-                    logger.info(f"Task {task.id}: Transcribed {chunk_path.name}")
-                    return True
+            # Update task metadata
+            with task._metadata_lock:
+                tm.word_count += word_count
+                tm.detected_language = language
+                # Add confidence scores if available
+                if confidence is not None:
+                    tm.confidence_scores.append(confidence)
+
+            logger.info("Task %s: Transcribed %s", task.id, chunk_path.name)
+            return True
 
         except Exception as e:
-            logger.error(f"Transcription error: {str(e)}")
+            logger.error("Transcription error: %s", e)
             return False
 
-        finally:
-            # Cleanup temp files
-            if temp_file and temp_file.exists():
-                try:
-                    temp_file.unlink()
-                except:
-                    pass
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create an async client whose connection pool matches the concurrency limit."""
+        return httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(self.api_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use in the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = self._create_client()
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared client; it is recreated on next use."""
+        client, self._client, self._client_loop = self._client, None, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    def _run(self, coro):
+        """Run a coroutine on the background loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        """Close the shared client and stop the background event loop."""
+        if self._loop.is_closed():
+            return
+        if self._loop_thread.is_alive():
+            self._run(self.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+        self._loop.close()
+
+    async def _transcribe_single_async(self, chunk_path: Path, task: TranscriptionTask) -> bool:
+        """Transcribe one chunk with the shared client."""
+        client = await self._get_client()
+        return await self.transcribe_chunk_async(chunk_path, task, client)
 
     def transcribe_chunk(self, chunk_path: Path, task: TranscriptionTask) -> bool:
         """Synchronous wrapper for async transcription."""
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(
-                self.transcribe_chunk_async(chunk_path, task)
-            )
-        finally:
-            loop.close()
+        return self._run(self._transcribe_single_async(chunk_path, task))
 
     async def transcribe_chunks_async(self, task: TranscriptionTask) -> bool:
         """Async batch processing of chunks."""
@@ -271,21 +1048,59 @@ class AudioTranscriber:
             transcripts_dir.mkdir(exist_ok=True)
             task.metadata['transcripts_dir'] = str(transcripts_dir)
 
-            # Process chunks with concurrency limit
-            failed_chunks = []
-            tasks = []
-            
-            for chunk_info in chunks_info:
-                chunk_path = chunks_dir / chunk_info["relative_path"]
-                tasks.append(self.transcribe_chunk_async(chunk_path, task))
+            # Pipeline: producers run FFmpeg preprocessing while up to
+            # max_concurrency consumers upload them over one shared client
+            uploaders = min(self.max_concurrency, len(chunks_info))
+            preprocessors = min(os.cpu_count() or 1, uploaders)
+            ready: asyncio.Queue = asyncio.Queue(maxsize=2 * self.max_concurrency)
+            pending = iter(enumerate(chunks_info))
+            results: Dict[int, bool] = {}
+
+            async def produce() -> None:
+                for index, chunk_info in pending:
+                    chunk_path = chunks_dir / chunk_info["relative_path"]
+                    # A failed chunk is handed on as None so a consumer records it and
+                    # no producer dies while its siblings block on the full queue
+                    try:
+                        upload_path = await self._prepare_upload(chunk_path, task)
+                    except Exception as e:
+                        logger.error("Task %s: Failed to prepare chunk %s: %s", task.id, chunk_path.name, e)
+                        upload_path = None
+                    await ready.put((index, chunk_path, upload_path))
+
+            async def produce_all() -> None:
+                try:
+                    await asyncio.gather(*(produce() for _ in range(preprocessors)))
+                finally:
+                    for _ in range(uploaders):
+                        await ready.put(None)
 
-            # Process in batches
-            results = await asyncio.gather(*tasks)
+            client = await self._get_client()
+
+            async def consume() -> None:
+                # A consumer must outlive any single chunk so the queue keeps draining
+                while (item := await ready.get()) is not None:
+                    index, chunk_path, upload_path = item
+                    try:
+                        results[index] = bool(upload_path) and await self.transcribe_chunk_async(
+                            chunk_path, task, client, upload_path
+                        )
+                    except Exception as e:
+                        logger.error("Task %s: Chunk %s failed: %s", task.id, chunk_path.name, e)
+                        results[index] = False
+
+            outcomes = await asyncio.gather(
+                produce_all(), *(consume() for _ in range(uploaders)),
+                return_exceptions=True
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    logger.error("Task %s: Transcription pipeline error: %s", task.id, outcome)
             
             failed_chunks = [
                 chunk_info["relative_path"]
-                for chunk_info, success in zip(chunks_info, results)
-                if not success
+                for index, chunk_info in enumerate(chunks_info)
+                if not results.get(index)
             ]
 
             if failed_chunks:
@@ -295,23 +1110,78 @@ class AudioTranscriber:
             return True
 
         except Exception as e:
-            logger.error(f"Task {task.id}: Transcription failed: {str(e)}")
+            logger.error("Task %s: Transcription failed: %s", task.id, e)
             task.set_error(str(e))
             return False
 
     def transcribe_all_chunks(self, task: TranscriptionTask) -> bool:
         """Enhanced synchronous wrapper for batch processing."""
-        loop = asyncio.new_event_loop()
+        return self._run(self.transcribe_chunks_async(task))
+
+    def _load_merge_cache(self, cache_path: Path) -> Dict[str, Tuple[Dict, bytes]]:
+        """
+        Read the merge resume cache.
+
+        The cache holds two lines per chunk: a JSON header (key, mtime, offset,
+        text, metadata) followed by the chunk's offset-adjusted segments, already
+        serialized as a comma-separated JSON fragment.
+        """
+        entries: Dict[str, Tuple[Dict, bytes]] = {}
         try:
-            return loop.run_until_complete(
-                self.transcribe_chunks_async(task)
-            )
-        finally:
-            loop.close()
+            with open(cache_path, 'rb') as f:
+                while True:
+                    header_line = f.readline()
+                    if not header_line:
+                        break
+                    header = loads(header_line)
+                    entries[header['key']] = (header, f.readline().rstrip(b'\n'))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable merge cache %s: %s", cache_path, e)
+            entries.clear()
+        return entries
+
+    def _load_merge_entry(self, json_file: Path, chunk_info: Dict,
+                          cache: Dict[str, Tuple[Dict, bytes]]) -> Tuple[Dict, bytes, bool]:
+        """Return a chunk's merge entry, reusing the cache unless the chunk JSON is newer."""
+        mtime = json_file.stat().st_mtime
+        offset = chunk_info.get('start_ms', 0) / 1000
+        cached = cache.get(json_file.name)
+        if cached is not None and cached[0].get('mtime', 0) >= mtime and cached[0].get('offset') == offset:
+            return cached[0], cached[1], False
+
+        chunk_data = _load_chunk_json(json_file)
+        transcription = chunk_data.get('transcription', {})
+
+        # The chunk dict is discarded afterwards, so shift segments in place
+        segments = transcription.get('segments') or ()
+        for segment in segments:
+            segment['start'] = segment.get('start', 0) + offset
+            segment['end'] = segment.get('end', 0) + offset
+
+        header = {
+            'key': json_file.name,
+            'mtime': mtime,
+            'offset': offset,
+            'text': transcription.get('text', ''),
+            'metadata': chunk_data.get('metadata', {}),
+        }
+        return header, b','.join(dumps(segment) for segment in segments), True
 
     def merge_transcripts(self, task: TranscriptionTask) -> bool:
         """
         Merge individual chunk transcriptions into a single transcript.
+
+        Chunk files are loaded by a small thread pool a few chunks ahead of the
+        writer and written straight to the merged files in manifest order, so
+        memory use is bounded by the read-ahead window rather than the whole
+        transcript. Segment timestamps are shifted by each chunk's start offset.
+        The merged JSON's text field is written as the chunks arrive, while
+        segments are spooled aside and appended after it.
+
+        Parsed chunks are recorded in a resume cache, so re-running a merge
+        that failed part way only parses chunks that are new or changed.
         
         Args:
             task (TranscriptionTask): The task containing transcription metadata.
@@ -324,37 +1194,118 @@ class AudioTranscriber:
             if not transcripts_dir.exists():
                 raise FileNotFoundError("Transcripts directory not found")
 
-            # Collect all JSON transcript files
-            json_files = sorted(transcripts_dir.glob("*.json"))
-            if not json_files:
+            # Merge in manifest order; globbing *.json would also pick up merged output
+            chunks_info = sorted(
+                task.metadata.get("chunks_info", {}).get("chunks", []),
+                key=lambda chunk_info: chunk_info["chunk_index"]
+            )
+            if not chunks_info:
                 raise ValueError("No transcripts found to merge")
 
-            merged_text = []
-            merged_metadata = {
-                'chunks': [],
-                'task_id': task.id,
-                'processed_at': datetime.now().isoformat(),
-            }
+            merged_text_path = transcripts_dir / "merged_transcript.txt"
+            merged_json_path = transcripts_dir / "merged_transcript.json"
+            cache_path = transcripts_dir / "_merge_cache.jsonl"
+            chunk_metadata = []
 
-            for json_file in json_files:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    chunk_data = json.load(f)
-                    merged_text.append(chunk_data.get('transcription', {}).get('text', ''))
-                    merged_metadata['chunks'].append(chunk_data.get('metadata', {}))
+            json_files = [
+                transcripts_dir / f"{Path(chunk_info['relative_path']).stem}.json"
+                for chunk_info in chunks_info
+            ]
+            cache = self._load_merge_cache(cache_path)
+            written = set()
+            parsed = 0
+            cache_tmp = cache_path.with_suffix('.tmp')
 
-            # Save merged transcript
-            merged_text_path = transcripts_dir / "merged_transcript.txt"
-            with open(merged_text_path, 'w', encoding='utf-8') as f:
-                f.write("\n".join(merged_text))
+            # Stream into temp siblings so a failed merge leaves the previous output intact
+            text_tmp = merged_text_path.with_name(merged_text_path.name + '.tmp')
+            json_tmp = merged_json_path.with_name(merged_json_path.name + '.tmp')
+            try:
+                with ThreadPoolExecutor(max_workers=min(_MERGE_READ_AHEAD, len(json_files))) as pool, \
+                        open(text_tmp, 'w', encoding='utf-8') as text_out, \
+                        open(json_tmp, 'wb') as json_out, \
+                        tempfile.SpooledTemporaryFile(_MERGE_SPOOL_BYTES, dir=transcripts_dir) as segments_out, \
+                        open(cache_tmp, 'wb') as cache_out:
+                    try:
+                        # Parsing order doesn't matter; offsets only depend on the manifest
+                        def submit(position: int):
+                            return pool.submit(self._load_merge_entry, json_files[position],
+                                               chunks_info[position], cache)
+
+                        pending = deque(submit(position)
+                                        for position in range(min(_MERGE_READ_AHEAD, len(json_files))))
+                        next_file = len(pending)
+
+                        json_out.write(b'{"text":"')
+                        first_segment = True
+
+                        for position in range(len(chunks_info)):
+                            header, fragment, fresh = pending.popleft().result()
+                            if next_file < len(json_files):
+                                pending.append(submit(next_file))
+                                next_file += 1
+
+                            if position:
+                                text_out.write("\n")
+                                json_out.write(b'\\n')
+                            text_out.write(header['text'])
+                            # The string's JSON encoding without its quotes continues the text field
+                            json_out.write(dumps(header['text'])[1:-1])
+
+                            if fragment:
+                                if not first_segment:
+                                    segments_out.write(b',')
+                                segments_out.write(fragment)
+                                first_segment = False
+
+                            chunk_metadata.append(header['metadata'])
+                            cache_out.write(dumps(header) + b'\n' + fragment + b'\n')
+                            written.add(header['key'])
+                            parsed += fresh
+
+                        json_out.write(b'","segments":[')
+                        segments_out.seek(0)
+                        shutil.copyfileobj(segments_out, json_out)
+                        json_out.write(b'],"task_id":')
+                        json_out.write(dumps(task.id))
+                        json_out.write(b'}')
+                    finally:
+                        # Keep entries not reached this run so a failed merge can resume
+                        for key, (header, fragment) in cache.items():
+                            if key not in written:
+                                cache_out.write(dumps(header) + b'\n' + fragment + b'\n')
+                        cache_out.close()
+                        os.replace(cache_tmp, cache_path)
+
+                os.replace(text_tmp, merged_text_path)
+                os.replace(json_tmp, merged_json_path)
+            except BaseException:
+                text_tmp.unlink(missing_ok=True)
+                json_tmp.unlink(missing_ok=True)
+                raise
 
             # Save merged metadata
+            merged_metadata = {
+                'chunks': chunk_metadata,
+                'task_id': task.id,
+                'processed_at': datetime.now().isoformat(),
+            }
             merged_metadata_path = transcripts_dir / "merged_metadata.json"
-            with open(merged_metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(merged_metadata, f, indent=2)
+            with open(merged_metadata_path, 'wb') as f:
+                f.write(dumps(merged_metadata, pretty=True))
+
+            update = {
+                'merged_transcript': str(merged_text_path),
+                'merged_transcript_json': str(merged_json_path),
+                'merged_metadata': str(merged_metadata_path),
+            }
+            with task._metadata_lock:
+                task.transcription_metadata.merged_transcript_path = str(merged_text_path)
+                task.metadata.update(update)
 
-            logger.info(f"Task {task.id}: Successfully merged transcripts")
+            logger.info("Task %s: Successfully merged transcripts (%d parsed, %d from cache)",
+                        task.id, parsed, len(chunks_info) - parsed)
             return True
 
         except Exception as e:
-            logger.error(f"Task {task.id}: Failed to merge transcripts: {str(e)}")
+            logger.error("Task %s: Failed to merge transcripts: %s", task.id, e)
             return False
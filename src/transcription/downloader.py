@@ -2,53 +2,88 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 from datetime import datetime
-import json
-import threading
+import logging
 from typing import Dict, Optional, Tuple, Union, List
 import yt_dlp
 import shutil
 import re
 import unicodedata
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import os
+import random
 import time
+import asyncio
 
 # Dynamically add project root to PYTHONPATH
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
 from models.tasks import TranscriptionTask, TaskStatus
-from config.settings import CONFIG
-from core.logger import setup_logger
+from config.settings import get_config
+from core.json_utils import dumps
 
-logger = setup_logger(__name__)
+logger = logging.getLogger(__name__)
+
+# yt-dlp info fields copied verbatim into metadata.json, in output order
+_METADATA_FIELDS = (
+    'title', 'description', 'duration', 'upload_date', 'uploader', 'channel_id',
+    'view_count', 'like_count', 'comment_count', 'tags', 'categories', 'language',
+)
+
+# sanitize_filename: characters to drop, and runs of dashes/whitespace to collapse
+_INVALID_RE = re.compile(r'[^\w\s-]')
+_COLLAPSE_RE = re.compile(r'[-\s]+')
+
+# Cheap shape check for http(s) URLs, run before yt-dlp builds an extractor
+_URL_RE = re.compile(r'^https?://[^\s/?#]+\.[^\s/?#]+(?:[/?#]\S*)?$', re.IGNORECASE)
+
+# Minimum seconds between progress updates from the yt-dlp hook
+_PROGRESS_INTERVAL = 0.25
+
+# wait_for_file: first and maximum delay between size checks, in seconds
+_WAIT_POLL_MIN = 0.05
+_WAIT_POLL_MAX = 0.5
+
+# Upper bound on a single retry sleep, in seconds
+_MAX_BACKOFF_SEC = 60
+
+# Subdirectories created under every video directory
+_SUBDIRS = ("audio", "chunks", "transcripts", "temp")
 
 class VideoDownloader:
     """Handles downloading of videos and extraction of metadata using yt-dlp."""
 
     def __init__(self, base_output_dir: Optional[Path] = None):
         """Initialize the VideoDownloader with a base output directory."""
-        self.base_output_dir = Path(base_output_dir or CONFIG.get('output_dir', 'downloads'))
+        self.config = get_config()
+        self.base_output_dir = Path(base_output_dir or self.config.output_dir)
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
-        self.max_retries = CONFIG.get('max_retries', 3)
-        self.retry_delay = CONFIG.get('retry_delay', 5)
-        self.lock = threading.Lock()
-        self.download_timeout = CONFIG.get('download_timeout', 3600)  # 1 hour default
-        self.verify_timeout = CONFIG.get('verify_timeout', 300)  # 5 minutes for verification
-
-    def sanitize_filename(self, filename: str) -> str:
-        """Create a clean, filesystem-safe filename."""
+        self.max_retries = self.config.max_retries
+        self.retry_delay = self.config.retry_delay
+        self.download_timeout = self.config.download_timeout  # 1 hour default
+        self.verify_timeout = self.config.verify_timeout  # 5 minutes for verification
+        self.keep_native_audio = self.config.keep_native_audio
+        # Single thread for metadata writes, kept off the download path
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DownloaderIO")
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def sanitize_filename(filename: str) -> str:
+        """Create a clean, filesystem-safe filename; results are memoized."""
         if not filename:
             return "untitled"
 
-        filename = unicodedata.normalize('NFKD', filename)
-        filename = filename.encode('ASCII', 'ignore').decode()
-        filename = re.sub(r'[^\w\s-]', '', filename)
-        filename = re.sub(r'[-\s]+', '-', filename).strip('-')
-        
-        if len(filename) > 100:
-            filename = filename[:100]
-            
-        return filename.lower() or "untitled"
+        # ASCII titles are unchanged by NFKD folding, so skip the Unicode pass
+        if not filename.isascii():
+            filename = unicodedata.normalize('NFKD', filename).encode('ASCII', 'ignore').decode('ascii')
+        filename = _COLLAPSE_RE.sub('-', _INVALID_RE.sub('', filename)).strip('-')
+
+        return filename[:100].lower() or "untitled"
+
+    def retry_backoff(self, attempt: int) -> float:
+        """Exponential delay in seconds before retry number attempt (0-based), capped."""
+        return min(_MAX_BACKOFF_SEC, self.retry_delay * 2 ** attempt)
 
     def create_video_directory(self, video_id: str, title: str) -> Path:
         """Create a unique directory for the video using ID and sanitized title."""
@@ -56,55 +91,51 @@ class VideoDownloader:
         dir_name = f"{video_id}-{sanitized_title[:50]}"
         video_dir = self.base_output_dir / dir_name
 
-        with self.lock:
-            video_dir.mkdir(exist_ok=True, parents=True)
-            (video_dir / "audio").mkdir(exist_ok=True)
-            (video_dir / "chunks").mkdir(exist_ok=True)
-            (video_dir / "transcripts").mkdir(exist_ok=True)
-            (video_dir / "temp").mkdir(exist_ok=True)  # Add temp directory
+        # mkdir(exist_ok=True) is race-free on its own, so concurrent downloads need no lock
+        (video_dir / _SUBDIRS[0]).mkdir(exist_ok=True, parents=True)
+        for subdir in _SUBDIRS[1:]:
+            (video_dir / subdir).mkdir(exist_ok=True)
 
         return video_dir
     def prepare_download_options(self, task: TranscriptionTask, video_dir: Path) -> Dict:
             """Prepare yt-dlp options with improved handling for large files."""
+            last_update = 0.0
+
             def progress_hook(d):
+                nonlocal last_update
                 try:
                     if d['status'] == 'downloading':
+                        # yt-dlp calls this many times a second; a few updates are enough
+                        now = time.monotonic()
+                        if now - last_update < _PROGRESS_INTERVAL:
+                            return
+                        last_update = now
+
                         total = d.get('total_bytes', 0) or d.get('total_bytes_estimate', 0)
                         downloaded = d.get('downloaded_bytes', 0)
-                        speed = d.get('speed', 0)
-                        eta = d.get('eta', 0)
-
-                        with task._lock:
-                            task.stats.total_bytes = total
-                            task.stats.downloaded_bytes = downloaded
-                            task.stats.speed = speed
-                            task.stats.eta = eta
-
-                            if total > 0:
-                                task.stats.progress = (downloaded / total) * 100
-                                task.metadata.update({
-                                    'download_speed': f"{speed / 1024 / 1024:.2f} MB/s" if speed else "N/A",
-                                    'time_remaining': f"{eta:.0f} seconds" if eta else "N/A",
-                                    'downloaded_size': f"{downloaded / 1024 / 1024:.1f}MB",
-                                    'total_size': f"{total / 1024 / 1024:.1f}MB"
-                                })
+
+                        # Raw numbers only; formatting is left to whoever displays them
+                        task.stats.update_progress(downloaded, total)
+                        task.stats.update(speed=d.get('speed') or 0, eta=d.get('eta') or 0)
+                        task.touch()
 
                     elif d['status'] == 'finished':
-                        with task._lock:
-                            task.stats.progress = 100.0
+                        task.stats.progress = 100.0
+                        with task._metadata_lock:
                             task.metadata['download_completed_at'] = datetime.now().isoformat()
                             filename = d.get('filename', '')
                             if filename:
-                                logger.debug(f"Finished downloading file: {filename}")
+                                logger.debug("Finished downloading file: %s", filename)
                                 task.metadata['downloaded_filename'] = filename
+                            task.touch()
 
                 except Exception as e:
-                    logger.error(f"Error in progress hook for Task {task.id}: {str(e)}")
+                    logger.error("Error in progress hook for Task %s: %s", task.id, e)
 
             temp_dir = video_dir / "temp"
             output_template = str(temp_dir / "%(id)s.%(ext)s")
 
-            return {
+            options = {
                 'format': 'bestaudio/best',
                 'outtmpl': output_template,
                 'progress_hooks': [progress_hook],
@@ -114,103 +145,126 @@ class VideoDownloader:
                 'writesubtitles': False,  # Changed to False as we handle transcription separately
                 'writeautomaticsub': False,
                 'retries': self.max_retries,
-                'retry_sleep': self.retry_delay,
-                'socket_timeout': CONFIG.get('api_timeout', 300),
+                # yt-dlp calls these with the retry number and sleeps for the result
+                'retry_sleep_functions': {
+                    'http': self.retry_backoff,
+                    'fragment': self.retry_backoff,
+                    'extractor': self.retry_backoff,
+                },
+                'socket_timeout': self.config.api_timeout,
                 'fragment_retries': 10,
                 'extractor_retries': 5,
                 'file_access_retries': 5,
+            }
+            if self.keep_native_audio:
+                # Chunking decodes the source with ffmpeg anyway, so skip the WAV pass
+                return options
+
+            options.update({
                 'postprocessors': [{
                     'key': 'FFmpegExtractAudio',
                     'preferredcodec': 'wav',
                     'preferredquality': '192',
                     'nopostoverwrites': False,
                 }],
-                # Add FFmpeg arguments directly
+                # Resample with output options rather than a filter graph, using every core
                 'postprocessor_args': [
-                    '-af', 'aformat=sample_fmts=s16:sample_rates=16000:channel_layouts=mono',
+                    '-threads', '0', '-filter_threads', str(os.cpu_count() or 1),
+                    '-ar', '16000', '-ac', '1', '-sample_fmt', 's16',
                 ],
-            }
+            })
+            return options
 
     def save_metadata(self, task: TranscriptionTask, info: Dict, video_dir: Path) -> None:
         """Save video metadata to JSON file."""
-        metadata = {
-            'title': info.get('title'),
-            'description': info.get('description'),
-            'duration': info.get('duration'),
-            'upload_date': info.get('upload_date'),
-            'uploader': info.get('uploader'),
-            'channel_id': info.get('channel_id'),
-            'view_count': info.get('view_count'),
-            'like_count': info.get('like_count'),
-            'comment_count': info.get('comment_count'),
-            'tags': info.get('tags', []),
-            'categories': info.get('categories', []),
-            'language': info.get('language'),
-            'automatic_captions': bool(info.get('automatic_captions')),
-            'subtitles': bool(info.get('subtitles')),
+        get = info.get
+        metadata = {key: get(key) for key in _METADATA_FIELDS}
+        metadata.update({
+            'tags': get('tags', []),
+            'categories': get('categories', []),
+            'automatic_captions': bool(get('automatic_captions')),
+            'subtitles': bool(get('subtitles')),
             'download_timestamp': datetime.now().isoformat(),
-            'video_url': info.get('webpage_url'),
-            'format_id': info.get('format_id'),
-            'ext': info.get('ext'),
-            'audio_channels': info.get('audio_channels'),
-            'filesize_approx': info.get('filesize_approx'),
-            'duration_string': info.get('duration_string'),
-            'processed_title': self.sanitize_filename(info.get('title', '')),
-        }
+            'video_url': get('webpage_url'),
+            'format_id': get('format_id'),
+            'ext': get('ext'),
+            'audio_channels': get('audio_channels'),
+            'filesize_approx': get('filesize_approx'),
+            'duration_string': get('duration_string'),
+            'processed_title': self.sanitize_filename(get('title', '')),
+        })
 
         metadata_path = video_dir / 'metadata.json'
+        with task._metadata_lock:
+            task.metadata['video_metadata'] = metadata
+            task.title = metadata['processed_title']
+            task.touch()
+
         try:
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-            logger.info(f"Task {task.id}: Metadata saved to {metadata_path}")
-            
-            with task._lock:
-                task.metadata['video_metadata'] = metadata
-                task.title = metadata['processed_title']
-                
+            # Serialize here; the write and fsync run on the I/O thread while the download starts
+            payload = dumps(metadata, pretty=True)
         except Exception as e:
-            logger.error(f"Task {task.id}: Failed to save metadata: {e}")
+            logger.error("Task %s: Failed to save metadata: %s", task.id, e)
+            return
 
-    def verify_wav_file(self, wav_path: Path, timeout: int = 30) -> bool:
-        """Verify that the WAV file exists and is valid."""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if wav_path.exists() and wav_path.stat().st_size > 0:
-                try:
-                    # Try to read the file header
-                    with open(wav_path, 'rb') as f:
-                        header = f.read(44)  # WAV header is 44 bytes
-                        if len(header) == 44 and header.startswith(b'RIFF') and b'WAVE' in header:
-                            return True
-                except Exception as e:
-                    logger.error(f"Error verifying WAV file {wav_path}: {e}")
-            time.sleep(1)
-        return False
+        try:
+            self._io_pool.submit(self._write_metadata, task, metadata_path, payload)
+        except RuntimeError as e:
+            # The pool is gone after close(); write on this thread instead
+            logger.warning("Task %s: Metadata I/O thread unavailable (%s), writing synchronously", task.id, e)
+            self._write_metadata(task, metadata_path, payload)
+
+    @staticmethod
+    def _write_metadata(task: TranscriptionTask, metadata_path: Path, payload: bytes) -> None:
+        """Write metadata.json in one unbuffered write and flush it to disk."""
+        try:
+            with open(metadata_path, 'wb', buffering=0) as f:
+                f.write(payload)
+                os.fsync(f.fileno())
+            logger.info("Task %s: Metadata saved to %s", task.id, metadata_path)
+        except Exception as e:
+            logger.error("Task %s: Failed to save metadata: %s", task.id, e)
+
+    def verify_wav_file(self, wav_path: Path) -> bool:
+        """Check the RIFF/WAVE header of a fully written WAV file with a single read."""
+        try:
+            fd = os.open(wav_path, os.O_RDONLY)
+            try:
+                header = os.pread(fd, 12, 0)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.error("Error verifying WAV file %s: %s", wav_path, e)
+            return False
+        return header[:4] == b'RIFF' and header[8:12] == b'WAVE'
 
     def wait_for_file(self, file_path: Path, timeout: int = 300) -> bool:
-        """Wait for a file to appear and be fully written."""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if file_path.exists():
-                try:
-                    # Try to open the file to ensure it's fully written
-                    with open(file_path, 'rb') as f:
-                        f.seek(-1024, os.SEEK_END)  # Try to read the last 1KB
-                        f.read(1024)
-                    return True
-                except (IOError, OSError):
-                    time.sleep(1)
-            time.sleep(1)
+        """Wait for a file to appear and stop growing between two consecutive stats."""
+        deadline = time.monotonic() + timeout
+        delay = _WAIT_POLL_MIN
+        last_size = -1
+        while time.monotonic() < deadline:
+            try:
+                size = os.stat(file_path).st_size
+            except OSError:
+                size = -1
+            if size > 0 and size == last_size:
+                return True
+            last_size = size
+            time.sleep(delay)
+            delay = min(delay * 2, _WAIT_POLL_MAX)
         return False
 
     def download_video(self, task: TranscriptionTask) -> Tuple[bool, Optional[str]]:
         """Download video and extract audio with improved error handling."""
-        logger.info(f"Task {task.id}: Starting download for URL: {task.url}")
+        logger.info("Task %s: Starting download for URL: %s", task.id, task.url)
         temp_dir = None
         
         try:
             if not task.url or not task.url.strip():
                 return False, "Invalid or empty URL"
+            if not _URL_RE.match(task.url.strip()):
+                return False, f"Not a valid http(s) URL: {task.url}"
 
             # Extract video info
             with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
@@ -233,7 +287,6 @@ class VideoDownloader:
             # Set up paths
             temp_dir = video_dir / "temp"
             final_audio_dir = video_dir / "audio"
-            final_wav = final_audio_dir / f"{video_id}.wav"
 
             # Download with retry logic
             ydl_opts = self.prepare_download_options(task, video_dir)
@@ -242,63 +295,76 @@ class VideoDownloader:
             
             for attempt in range(self.max_retries):
                 try:
+                    # Reuse the extracted info rather than re-fetching it from the site. Like
+                    # --load-info-json, drop the first pass's format selection (requested_formats
+                    # etc.) so 'bestaudio/best' is chosen afresh instead of the merged video.
                     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        ydl.download([task.url])
+                        ydl.process_ie_result(
+                            yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=True),
+                            download=True
+                        )
                     download_success = True
                     break
                 except Exception as e:
                     error_msg = str(e)
-                    logger.warning(f"Download attempt {attempt + 1} failed: {error_msg}")
+                    logger.warning("Download attempt %d failed: %s", attempt + 1, error_msg)
                     if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay)
+                        time.sleep(self.retry_backoff(attempt) * (0.5 + random.random()))
                         # Clear temp directory for retry
                         if temp_dir and temp_dir.exists():
                             try:
                                 shutil.rmtree(str(temp_dir))
                                 temp_dir.mkdir(exist_ok=True)
                             except Exception as cleanup_error:
-                                logger.warning(f"Failed to clean temp directory before retry: {cleanup_error}")
+                                logger.warning("Failed to clean temp directory before retry: %s", cleanup_error)
 
             if not download_success:
                 return False, f"Failed to download after {self.max_retries} attempts: {error_msg}"
 
-            # Find and verify the WAV file
-            wav_files = list(temp_dir.glob("*.wav"))
-            if not wav_files:
-                return False, "WAV file not found after download and conversion"
-
-            # Move to final location
-            temp_wav = wav_files[0]
+            if self.keep_native_audio:
+                # yt-dlp leaves only the finished download behind in temp/
+                downloaded = [p for p in temp_dir.iterdir() if p.suffix not in ('.part', '.ytdl')]
+                if not downloaded:
+                    return False, "Audio file not found after download"
+                temp_audio = downloaded[0]
+                final_audio = final_audio_dir / f"{video_id}{temp_audio.suffix}"
+            else:
+                # Find and verify the WAV file
+                wav_files = list(temp_dir.glob("*.wav"))
+                if not wav_files:
+                    return False, "WAV file not found after download and conversion"
+                temp_audio = wav_files[0]
+                final_audio = final_audio_dir / f"{video_id}.wav"
+
+            # Move to final location; temp/ and audio/ share video_dir, so this is a rename
             try:
-                if final_wav.exists():
-                    final_wav.unlink()
-                shutil.move(str(temp_wav), str(final_wav))
+                os.replace(temp_audio, final_audio)
             except Exception as e:
-                return False, f"Failed to move WAV file to final location: {str(e)}"
-
-            # Verify the final file
-            if not self.verify_wav_file(final_wav):
-                return False, "Failed to verify final WAV file"
+                return False, f"Failed to move audio file to final location: {str(e)}"
 
             # Wait for file to be fully written
-            if not self.wait_for_file(final_wav):
+            if not self.wait_for_file(final_audio):
                 return False, "Timeout waiting for file to be fully written"
 
+            # Verify the final file; the header is written up front, so one check is enough
+            if not self.keep_native_audio and not self.verify_wav_file(final_audio):
+                return False, "Failed to verify final WAV file"
+
             # Set the path and clean up
-            task.temp_video_path = final_wav
-            logger.info(f"Task {task.id}: Audio file ready at {final_wav}")
+            task.temp_video_path = final_audio
+            logger.info("Task %s: Audio file ready at %s", task.id, final_audio)
             
             try:
                 if temp_dir and temp_dir.exists():
                     shutil.rmtree(str(temp_dir))
             except Exception as e:
-                logger.warning(f"Failed to clean up temp directory: {e}")
+                logger.warning("Failed to clean up temp directory: %s", e)
 
             return True, None
 
         except Exception as e:
             error_msg = f"Unexpected error during video download: {str(e)}"
-            logger.exception(f"Task {task.id}: {error_msg}")
+            logger.exception("Task %s: %s", task.id, error_msg)
             # Cleanup on error
             if temp_dir and temp_dir.exists():
                 try:
@@ -307,6 +373,25 @@ class VideoDownloader:
                     pass
             return False, error_msg
 
+    async def download_video_async(self, task: TranscriptionTask) -> Tuple[bool, Optional[str]]:
+        """Run download_video in a worker thread; each call gets its own YoutubeDL instance."""
+        return await asyncio.to_thread(self.download_video, task)
+
+    async def download_many(self, tasks: List[TranscriptionTask]) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Download several videos concurrently, at most max_concurrent_downloads at a time.
+
+        Returns:
+            List[Tuple[bool, Optional[str]]]: The download_video result for each task, in order.
+        """
+        slots = asyncio.Semaphore(self.config.max_concurrent_downloads)
+
+        async def download(task: TranscriptionTask) -> Tuple[bool, Optional[str]]:
+            async with slots:
+                return await self.download_video_async(task)
+
+        return await asyncio.gather(*(download(task) for task in tasks))
+
     def cleanup_task(self, task: TranscriptionTask) -> None:
         """Clean up any remaining temporary files for a task."""
         try:
@@ -316,4 +401,8 @@ class VideoDownloader:
                 if temp_dir.exists():
                     shutil.rmtree(str(temp_dir))
         except Exception as e:
-            logger.error(f"Error cleaning up task {task.id}: {e}")
\ No newline at end of file
+            logger.error("Error cleaning up task %s: %s", task.id, e)
+
+    def close(self) -> None:
+        """Wait for pending metadata writes and stop the I/O thread."""
+        self._io_pool.shutdown(wait=True)
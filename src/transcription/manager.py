@@ -8,18 +8,20 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
+import logging
 import threading
-import queue
-from typing import List, Optional
+from collections import deque
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional, Set, Tuple
 
 from models.tasks import TranscriptionTask, TaskStatus
 from core.logger import setup_logger
 from transcription.downloader import VideoDownloader
 from transcription.splitter import AudioSplitter
 from transcription.audio_transcriber import AudioTranscriber  # Import the AudioTranscriber
-from config.settings import CONFIG
+from config.settings import get_config
 
-logger = setup_logger(__name__)
+logger = logging.getLogger(__name__)
 
 class TranscriptionManager:
     """
@@ -27,10 +29,27 @@ class TranscriptionManager:
     Utilizes worker threads to process tasks concurrently.
     """
 
-    def __init__(self):
-        """Initialize the TranscriptionManager with workers and a task queue."""
-        self.tasks: List[TranscriptionTask] = []
-        self.task_queue = queue.Queue(maxsize=CONFIG.get('max_queue_size', 100))
+    def __init__(self, on_task_update: Optional[Callable[[], None]] = None):
+        """
+        Initialize the TranscriptionManager with workers and a task queue.
+
+        Args:
+            on_task_update (Optional[Callable[[], None]]): Called from worker threads
+                whenever a task's displayed state changes.
+        """
+        # Configure logging handlers once for the whole transcription package
+        setup_logger('transcription')
+
+        self.config = get_config()
+        self.on_task_update = on_task_update
+        # tasks and _tasks_by_id are replaced, never mutated, under self.lock so readers need no lock
+        self.tasks: Tuple[TranscriptionTask, ...] = ()
+        self._urls: Set[str] = set()  # URLs in self.tasks, for O(1) duplicate checks
+        self._tasks_by_id: Mapping[str, TranscriptionTask] = MappingProxyType({})
+        # Queued tasks, plus a count of queued and in-progress tasks that shutdown() waits on
+        self.task_queue: deque = deque()
+        self._queue_cv = threading.Condition()
+        self._pending = 0
         self.shutdown_event = threading.Event()
         self.workers: List[threading.Thread] = []
         self.lock = threading.Lock()
@@ -50,11 +69,11 @@ class TranscriptionManager:
                 logger.warning("Worker threads have already been started. Skipping.")
                 return
 
-            for i in range(CONFIG.get('max_workers', 4)):
-                worker = threading.Thread(target=self._worker, name=f"Worker-{i+1}", daemon=False)
+            for i in range(self.config.max_workers):
+                worker = threading.Thread(target=self._worker, name=f"Worker-{i+1}", daemon=True)
                 worker.start()
                 self.workers.append(worker)
-                logger.info(f"Started worker thread: {worker.name}")
+                logger.info("Started worker thread: %s", worker.name)
 
             self.workers_started = True
 
@@ -69,48 +88,80 @@ class TranscriptionManager:
             bool: True if task was added successfully, False otherwise.
         """
         with self.lock:
-            if any(task.url == url for task in self.tasks):
-                logger.warning(f"Task for URL {url} already exists.")
+            if url in self._urls:
+                logger.warning("Task for URL %s already exists.", url)
                 return False
 
             task = TranscriptionTask(url=url)
-            self.tasks.append(task)
-            logger.info(f"Task {task.id} added for URL: {url}")
-
-        try:
-            self.task_queue.put(task, block=False)
-            logger.info(f"Task {task.id} queued successfully.")
+            task.on_change = self.on_task_update
+            self.tasks = self.tasks + (task,)
+            self._urls.add(url)
+            self._tasks_by_id = MappingProxyType({**self._tasks_by_id, task.id: task})
+            logger.info("Task %s added for URL: %s", task.id, url)
+
+        if self._enqueue(task):
+            logger.info("Task %s queued successfully.", task.id)
             return True
-        except queue.Full:
-            logger.warning(f"Task queue is full. Could not add task for URL: {url}")
-            with self.lock:
-                self.tasks.remove(task)
-            return False
+
+        if self.shutdown_event.is_set():
+            logger.warning("Shutting down. Could not add task for URL: %s", url)
+        else:
+            logger.warning("Task queue is full. Could not add task for URL: %s", url)
+        with self.lock:
+            self.tasks = tuple(t for t in self.tasks if t is not task)
+            self._urls.discard(url)
+            self._tasks_by_id = MappingProxyType({k: t for k, t in self._tasks_by_id.items() if t is not task})
+        return False
+
+    def _enqueue(self, task: TranscriptionTask) -> bool:
+        """
+        Append a task to the queue and wake one worker.
+
+        Returns False without queuing when the queue is full or shutdown has
+        started; the check shares the lock shutdown() sets its flag under.
+        """
+        with self._queue_cv:
+            if self.shutdown_event.is_set() or len(self.task_queue) >= self.config.max_queue_size:
+                return False
+            self.task_queue.append(task)
+            self._pending += 1
+            self._queue_cv.notify()
+        return True
+
+    def _task_done(self):
+        """Mark one task finished and wake shutdown() once nothing is pending."""
+        with self._queue_cv:
+            self._pending -= 1
+            if self._pending == 0:
+                self._queue_cv.notify_all()
 
     def _worker(self):
-        """Worker thread to process tasks."""
-        while not self.shutdown_event.is_set():
+        """Worker thread to process tasks; exits once shutdown is requested and the queue is empty."""
+        cv = self._queue_cv
+        while True:
+            with cv:
+                # _enqueue() and shutdown() both notify, so idle workers sleep until needed
+                while not self.task_queue and not self.shutdown_event.is_set():
+                    cv.wait()
+                if not self.task_queue:
+                    return
+                task: TranscriptionTask = self.task_queue.popleft()
+
             try:
-                task: TranscriptionTask = self.task_queue.get(timeout=1)
-                logger.info(f"{threading.current_thread().name} picked up Task {task.id}")
-                try:
-                    self._process_task(task)
-                except Exception as e:
-                    logger.exception(f"Unexpected error processing Task {task.id}: {e}")
-                    task.set_error(str(e))
-                    task.update_status(TaskStatus.FAILED)
-                finally:
-                    self.task_queue.task_done()
-                    logger.info(f"{threading.current_thread().name} completed Task {task.id}")
-            except queue.Empty:
-                continue
+                logger.info("%s picked up Task %s", threading.current_thread().name, task.id)
+                self._process_task(task)
             except Exception as e:
-                logger.exception(f"Unexpected error in worker thread: {e}")
+                logger.exception("Unexpected error processing Task %s: %s", task.id, e)
+                task.set_error(str(e))
+                task.update_status(TaskStatus.FAILED)
+            finally:
+                self._task_done()
+                logger.info("%s completed Task %s", threading.current_thread().name, task.id)
 
     def _process_task(self, task: TranscriptionTask):
         """Process a task by downloading the video, splitting the audio, transcribing, and merging transcripts."""
         try:
-            logger.info(f"Task {task.id}: Starting processing for URL: {task.url}")
+            logger.info("Task %s: Starting processing for URL: %s", task.id, task.url)
             task.update_status(TaskStatus.DOWNLOADING)
 
             # Download the video
@@ -118,22 +169,30 @@ class TranscriptionManager:
             if not success:
                 task.set_error(error or "Failed to download video")
                 task.update_status(TaskStatus.FAILED)
-                logger.error(f"Task {task.id}: Failed to download video - {error}")
+                logger.error("Task %s: Failed to download video - %s", task.id, error)
                 return
 
-            logger.info(f"Task {task.id}: Download complete for video: {task.title}")
+            logger.info("Task %s: Download complete for video: %s", task.id, task.title)
 
-            # Split the audio
+            # Split the audio, or encode API-ready chunks in one pass
             task.update_status(TaskStatus.SPLITTING)
-            chunks_info = self.splitter.split_audio(task)
+            if self.config.transcription.skip_preprocess:
+                chunks_info = self.transcriber.prepare_chunks(task)
+            else:
+                # WAV chunks are encoded to MP3 before upload, so size them to the encoded limit
+                chunks_info = self.splitter.split_audio(
+                    task,
+                    self.config.chunk_duration_sec or self.transcriber.target_segment_seconds(),
+                    reencoded=self.config.audio_format == 'wav',
+                )
 
             if not chunks_info:
                 task.set_error("Audio splitting failed")
                 task.update_status(TaskStatus.FAILED)
-                logger.error(f"Task {task.id}: Audio splitting failed")
+                logger.error("Task %s: Audio splitting failed", task.id)
                 return
 
-            logger.info(f"Task {task.id}: Audio split into {len(chunks_info)} chunks for {task.title}")
+            logger.info("Task %s: Audio split into %d chunks for %s", task.id, len(chunks_info), task.title)
 
             # Transcribe the audio chunks
             task.update_status(TaskStatus.TRANSCRIBING)
@@ -142,10 +201,10 @@ class TranscriptionManager:
             if not transcription_success:
                 task.set_error("Audio transcription failed")
                 task.update_status(TaskStatus.FAILED)
-                logger.error(f"Task {task.id}: Audio transcription failed")
+                logger.error("Task %s: Audio transcription failed", task.id)
                 return
 
-            logger.info(f"Task {task.id}: Audio transcription completed for all chunks")
+            logger.info("Task %s: Audio transcription completed for all chunks", task.id)
 
             # Merge the transcripts
             merge_success = self.transcriber.merge_transcripts(task)
@@ -153,14 +212,14 @@ class TranscriptionManager:
             if not merge_success:
                 task.set_error("Merging transcripts failed")
                 task.update_status(TaskStatus.FAILED)
-                logger.error(f"Task {task.id}: Merging transcripts failed")
+                logger.error("Task %s: Merging transcripts failed", task.id)
                 return
 
-            logger.info(f"Task {task.id}: Transcripts merged successfully")
+            logger.info("Task %s: Transcripts merged successfully", task.id)
 
             # Update the task status to COMPLETED
             task.update_status(TaskStatus.COMPLETED)
-            logger.info(f"Task {task.id}: Task completed successfully.")
+            logger.info("Task %s: Task completed successfully.", task.id)
 
         except Exception as e:
             error_msg = f"Error processing Task {task.id}: {str(e)}"
@@ -168,44 +227,60 @@ class TranscriptionManager:
             task.set_error(error_msg)
             task.update_status(TaskStatus.FAILED)
 
-    def resume_task(self, task: TranscriptionTask):
-        """Resume a paused or failed task."""
+    def resume_task(self, task: TranscriptionTask) -> bool:
+        """
+        Resume a paused or failed task.
+
+        Returns:
+            bool: True if the task was queued again, False otherwise.
+        """
         with self.lock:
-            if task.can_resume():
-                task.update_status(TaskStatus.PENDING)
-                self.task_queue.put(task)
-                logger.info(f"Task {task.id} has been resumed.")
-            else:
-                logger.warning(f"Task {task.id} is not in a resumable state.")
+            if not task.can_resume():
+                logger.warning("Task %s is not in a resumable state.", task.id)
+                return False
+
+            # Mark pending before queuing so a worker's first status update isn't overwritten
+            previous_status = task.status
+            task.update_status(TaskStatus.PENDING)
+            if not self._enqueue(task):
+                task.update_status(previous_status)
+                if self.shutdown_event.is_set():
+                    logger.warning("Shutting down. Could not resume Task %s", task.id)
+                else:
+                    logger.warning("Task queue is full. Could not resume Task %s", task.id)
+                return False
+
+            logger.info("Task %s has been resumed.", task.id)
+            return True
 
     def shutdown(self):
         """Shutdown the TranscriptionManager, ensuring all workers exit cleanly."""
         logger.info("TranscriptionManager: Initiating shutdown...")
-        self.shutdown_event.set()
+        with self._queue_cv:
+            self.shutdown_event.set()
+            self._queue_cv.notify_all()
 
-        # Wait for all tasks in the queue to be processed
-        self.task_queue.join()
+            # Workers drain the queue before exiting; wait for queued and running tasks
+            while self._pending:
+                self._queue_cv.wait()
         logger.debug("TranscriptionManager: All tasks in the queue have been processed.")
 
         # Terminate worker threads
         for worker in self.workers:
             worker.join(timeout=2)
             if worker.is_alive():
-                logger.warning(f"{worker.name} did not terminate properly.")
+                logger.warning("%s did not terminate properly.", worker.name)
             else:
-                logger.info(f"{worker.name} terminated successfully.")
+                logger.info("%s terminated successfully.", worker.name)
 
+        self.downloader.close()
+        self.transcriber.close()
         logger.info("TranscriptionManager: All worker threads have been terminated.")
 
     def get_tasks(self) -> List[TranscriptionTask]:
-        """Get the list of tasks."""
-        with self.lock:
-            return list(self.tasks)
+        """Get the list of tasks from the current snapshot, without locking."""
+        return list(self.tasks)
 
     def get_task_by_id(self, task_id: str) -> Optional[TranscriptionTask]:
         """Retrieve a task by its ID."""
-        with self.lock:
-            for task in self.tasks:
-                if task.id == task_id:
-                    return task
-        return None
+        return self._tasks_by_id.get(task_id)
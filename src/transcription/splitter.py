@@ -1,18 +1,24 @@
 # transcription/splitter.py
 
+import logging
+import os
 import subprocess
 from pathlib import Path
-import json
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime
 import threading
-import math
 
 from models.tasks import TranscriptionTask
-from core.logger import setup_logger
-from config.settings import CONFIG  # Ensure CONFIG is imported for configuration parameters
+from config.settings import get_config
+from core.json_utils import dumps, loads
 
-logger = setup_logger(__name__)
+logger = logging.getLogger(__name__)
+
+# ffprobe command prefix for duration and size; the input path is appended
+_FFPROBE_FORMAT_ARGS = ('ffprobe', '-v', 'error', '-show_format', '-of', 'json')
+
+# Upper bound on the container header written before the PCM data of a WAV chunk
+_WAV_HEADER_SIZE = 1024
 
 
 class AudioSplitter:
@@ -22,215 +28,259 @@ class AudioSplitter:
 
     def __init__(self):
         """Initialize AudioSplitter with configurable parameters."""
-        self.chunk_max_size_bytes = CONFIG.get('chunk_max_size_bytes', 25 * 1024 * 1024)  # 25 MB
-        self.chunk_duration_sec = CONFIG.get('chunk_duration_sec', 300)  # Default chunk duration: 5 minutes
-        self.audio_format = CONFIG.get('audio_format', 'wav')
-        self.sample_rate = CONFIG.get('sample_rate', 16000)
-        self.channels = CONFIG.get('channels', 1)
+        config = get_config()
+        self.chunk_max_size_bytes = config.chunk_max_size_bytes  # 25 MB
+        self.chunk_duration_sec = config.chunk_duration_sec  # 0 sizes chunks to the upload limit
+        self.audio_format = config.audio_format
+        self.sample_rate = config.sample_rate
+        self.channels = config.channels
         self.lock = threading.Lock()
 
-    def get_audio_duration(self, audio_file_path: Path) -> Optional[float]:
+        # Invariant part of the segmenting ffmpeg command
+        self._ffmpeg_output_args = (
+            '-ar', str(self.sample_rate),
+            '-ac', str(self.channels),
+            '-map', '0:a',
+            '-f', 'segment',
+            '-reset_timestamps', '1',
+            '-segment_list_type', 'csv',
+        )
+
+    def get_audio_duration(self, audio_file_path: Path) -> Optional[Tuple[float, int]]:
         """
-        Get the duration of the audio file using ffprobe.
+        Get the duration and size of the audio file with a single ffprobe call.
 
         Args:
             audio_file_path (Path): Path to the audio file.
 
         Returns:
-            Optional[float]: Duration in seconds if successful, None otherwise.
+            Optional[Tuple[float, int]]: Duration in seconds and size in bytes if successful, None otherwise.
         """
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            str(audio_file_path)
-        ]
+        cmd = (*_FFPROBE_FORMAT_ARGS, str(audio_file_path))
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            duration_str = result.stdout.strip()
-            logger.debug(f"Duration output from ffprobe: {duration_str}")
+            result = subprocess.run(cmd, capture_output=True, check=True)
+            fmt = loads(result.stdout)['format']
+            logger.debug("Format output from ffprobe: %s", fmt)
 
-            if duration_str == 'N/A' or not duration_str:
+            duration_str = fmt.get('duration')
+            if duration_str in (None, 'N/A', ''):
                 raise ValueError("Duration not available")
 
-            duration = float(duration_str)
-            return duration
+            return float(duration_str), int(fmt['size'])
         except subprocess.CalledProcessError as e:
-            logger.error(f"ffprobe failed: {e.stderr}")
-        except ValueError as e:
-            logger.error(f"Error parsing duration: {str(e)}")
+            logger.error("ffprobe failed: %s", e.stderr.decode('utf-8', 'replace'))
+        except (KeyError, ValueError) as e:
+            logger.error("Error parsing duration: %s", e)
         except Exception as e:
-            logger.error(f"Unexpected error in get_audio_duration: {str(e)}")
+            logger.error("Unexpected error in get_audio_duration: %s", e)
 
         return None
 
-    def split_audio(self, task: TranscriptionTask) -> Optional[List[Dict]]:
+    def split_audio(self, task: TranscriptionTask, chunk_duration: Optional[int] = None,
+                    reencoded: bool = False) -> Optional[List[Dict]]:
         """
         Split audio file into chunks using ffmpeg.
 
         Args:
             task (TranscriptionTask): TranscriptionTask containing audio file information.
+            chunk_duration (Optional[int]): Seconds per chunk; defaults to CHUNK_DURATION_SEC, and
+                to the longest chunk within the size limit when that is 0.
+            reencoded (bool): The chunks are re-encoded before upload, which enforces the size
+                limit on its output, so the chunk files themselves may exceed it.
 
         Returns:
             Optional[List[Dict]]: List of dictionaries containing chunk information, or None if failed.
         """
         try:
-            with task._lock:
+            # Copy what is needed into locals; no lock is held across file or subprocess I/O
+            with task._metadata_lock:
                 video_dir = Path(task.metadata.get('video_dir', ''))
                 audio_path = task.temp_video_path
-                if not audio_path:
-                    raise FileNotFoundError("Audio path not set in task.temp_video_path")
-                chunks_dir = video_dir / "chunks"
-                chunks_dir.mkdir(parents=True, exist_ok=True)
-                task.metadata['chunks_dir'] = str(chunks_dir)
+            if not audio_path:
+                raise FileNotFoundError("Audio path not set in task.temp_video_path")
+            chunks_dir = video_dir / "chunks"
+            chunks_dir.mkdir(parents=True, exist_ok=True)
 
-            logger.info(f"Using chunks directory: {chunks_dir.absolute()}")
+            logger.info("Using chunks directory: %s", chunks_dir.absolute())
 
             if not audio_path.exists():
                 error_msg = f"Audio file not found: {audio_path}"
                 logger.error(error_msg)
-                with task._lock:
+                with task._metadata_lock:
                     task.metadata["error"] = error_msg
                 return None
 
-            # Get audio duration
-            total_duration = self.get_audio_duration(audio_path)
-            if total_duration is None:
+            # Get audio duration and size
+            probe = self.get_audio_duration(audio_path)
+            if probe is None:
                 error_msg = "Failed to get audio duration."
                 logger.error(error_msg)
-                with task._lock:
+                with task._metadata_lock:
                     task.metadata["error"] = error_msg
                 return None
-
-            # Calculate the number of chunks based on desired chunk duration
-            num_chunks = max(1, math.ceil(total_duration / self.chunk_duration_sec))
-            logger.info(f"Splitting audio into {num_chunks} chunks with duration {self.chunk_duration_sec} seconds each.")
-
-            chunks_info = []
-            for i in range(num_chunks):
-                start_time = i * self.chunk_duration_sec
-                end_time = min((i + 1) * self.chunk_duration_sec, total_duration)
-                duration = end_time - start_time
-
-                # Ensure the chunk size does not exceed the maximum allowed size
-                estimated_chunk_size = (duration / total_duration) * audio_path.stat().st_size
-                if estimated_chunk_size > self.chunk_max_size_bytes:
-                    logger.warning(f"Estimated chunk size {estimated_chunk_size} bytes exceeds max size. Adjusting duration.")
-                    duration = duration * (self.chunk_max_size_bytes / estimated_chunk_size)
-                    end_time = start_time + duration
-
-                # Format timestamps
-                start_timestamp = self.format_timestamp_for_filename(start_time)
-                end_timestamp = self.format_timestamp_for_filename(end_time)
-
-                chunk_filename = f"chunk_{i:03d}_{start_timestamp}_{end_timestamp}.{self.audio_format}"
-                chunk_path = chunks_dir / chunk_filename
-
-                # Build ffmpeg command
-                ffmpeg_cmd = [
+            total_duration, audio_size = probe
+            total_duration_ms = round(total_duration * 1000)
+
+            # Shrink the chunk duration up front if chunks would exceed the maximum size.
+            # WAV chunks are 16-bit PCM, so their rate is exact regardless of the source codec.
+            requested_duration = chunk_duration or self.chunk_duration_sec
+            if self.audio_format == 'wav':
+                bytes_per_sec = self.sample_rate * self.channels * 2
+            else:
+                bytes_per_sec = audio_size / total_duration if total_duration else 0
+            size_limited = 1
+            if bytes_per_sec:
+                size_limited = max(1, int((self.chunk_max_size_bytes - _WAV_HEADER_SIZE) / bytes_per_sec))
+            if not requested_duration:
+                chunk_duration = size_limited
+            elif not reencoded and requested_duration > size_limited:
+                chunk_duration = size_limited
+                logger.warning("Chunks of %ss would exceed max size. Using %ss chunks.",
+                               requested_duration, chunk_duration)
+            else:
+                chunk_duration = requested_duration
+
+            num_chunks = max(1, -(-total_duration_ms // (chunk_duration * 1000)))  # Integer ceiling
+            logger.info("Splitting audio into %d chunks with duration %s seconds each.", num_chunks, chunk_duration)
+
+            suffix = f".{self.audio_format}"
+            segment_list = chunks_dir / "segments.csv"
+            while True:
+                with os.scandir(chunks_dir) as it:
+                    for entry in it:
+                        if entry.name.startswith(("chunk_", "segment_")) and entry.name.endswith(suffix):
+                            os.unlink(entry.path)
+
+                # One decode pass; the segment muxer writes every chunk and lists its real bounds
+                ffmpeg_cmd = (
                     'ffmpeg', '-y', '-i', str(audio_path),
-                    '-ss', str(start_time),
-                    '-t', str(duration),
-                    '-ar', str(self.sample_rate),
-                    '-ac', str(self.channels),
-                    '-map', '0:a',
-                    str(chunk_path)
-                ]
-
-                # Run ffmpeg command
+                    *self._ffmpeg_output_args,
+                    '-segment_time', str(chunk_duration),
+                    '-segment_list', str(segment_list),
+                    str(chunks_dir / f"segment_%03d.{self.audio_format}")
+                )
+
                 result = subprocess.run(
                     ffmpeg_cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE
                 )
 
                 if result.returncode != 0:
-                    logger.error(f"ffmpeg error for chunk {i}: {result.stderr}")
-                    continue
-
-                if not chunk_path.exists():
-                    logger.error(f"Failed to create chunk file: {chunk_path}")
-                    continue
-
-                chunk_info = self.create_chunk_metadata(
+                    logger.error("ffmpeg error while splitting audio: %s", result.stderr.decode('utf-8', 'replace'))
+                    with task._metadata_lock:
+                        task.metadata["error"] = "ffmpeg failed to split audio"
+                    return None
+
+                with open(segment_list, 'r', encoding='utf-8') as f:
+                    segments = [line.strip().rsplit(',', 2) for line in f if line.strip()]
+                segment_list.unlink()
+                if reencoded or not segments:
+                    break
+
+                # Re-run with shorter segments if any chunk is over the size limit;
+                # the estimate above can be off for variable-bitrate formats
+                largest = max((chunks_dir / Path(name).name).stat().st_size for name, _, _ in segments)
+                if largest <= self.chunk_max_size_bytes:
+                    break
+                if chunk_duration <= 1:
+                    raise ValueError(f"Chunk of {largest} bytes is over the "
+                                     f"{self.chunk_max_size_bytes} byte limit")
+                chunk_duration = max(1, int(chunk_duration * self.chunk_max_size_bytes / largest * 0.9))
+                logger.warning("Task %s: Chunk of %d bytes exceeds max size, retrying with %ds chunks",
+                               task.id, largest, chunk_duration)
+
+            # One timestamp for the whole split pass, shared by every chunk and the manifest
+            created_at = datetime.now().isoformat()
+            chunks_info = []
+            for i, (name, start, end) in enumerate(segments):
+                # Whole milliseconds from here on; ffmpeg lists bounds in fractional seconds
+                start_ms = min(round(float(start) * 1000), total_duration_ms)
+                end_ms = min(round(float(end) * 1000), total_duration_ms)
+
+                # Rename to the usual chunk_<index>_<start>_<end> name
+                start_timestamp = self.format_timestamp_for_filename(start_ms)
+                end_timestamp = self.format_timestamp_for_filename(end_ms)
+                chunk_path = chunks_dir / f"chunk_{i:03d}_{start_timestamp}_{end_timestamp}.{self.audio_format}"
+                os.replace(chunks_dir / Path(name).name, chunk_path)
+
+                chunks_info.append(self.create_chunk_metadata(
                     chunk_path,
-                    start_time * 1000,  # Convert to milliseconds
-                    end_time * 1000,
-                    i
-                )
-                chunks_info.append(chunk_info)
+                    start_ms,
+                    end_ms,
+                    i,
+                    created_at
+                ))
 
-                logger.info(f"Created chunk {i + 1}/{num_chunks}: {chunk_path.absolute()} (duration: {duration:.2f}s)")
+                logger.info("Created chunk %d/%d: %s (duration: %dms)",
+                            i + 1, len(segments), chunk_path.absolute(), end_ms - start_ms)
 
             if not chunks_info:
                 error_msg = "No chunks were created during audio splitting."
                 logger.error(error_msg)
-                with task._lock:
+                with task._metadata_lock:
                     task.metadata["error"] = error_msg
                 return None
 
             manifest = {
                 "total_chunks": len(chunks_info),
-                "total_duration_ms": total_duration * 1000,
+                "total_duration_ms": total_duration_ms,
                 "chunks": chunks_info,
                 "chunks_directory": str(chunks_dir.absolute()),
-                "created_at": datetime.now().isoformat()
+                "created_at": created_at
             }
 
             manifest_path = chunks_dir / "chunks_manifest.json"
             try:
-                with open(manifest_path, "w", encoding='utf-8') as f:
-                    json.dump(manifest, f, indent=2)
-                logger.info(f"Chunks manifest saved to {manifest_path}")
+                with open(manifest_path, "wb") as f:
+                    f.write(dumps(manifest))
+                logger.info("Chunks manifest saved to %s", manifest_path)
             except Exception as e:
-                logger.exception(f"Failed to save chunks manifest: {e}")
-                with task._lock:
+                logger.exception("Failed to save chunks manifest: %s", e)
+                with task._metadata_lock:
                     task.metadata["error"] = f"Failed to save chunks manifest: {e}"
                 return None
 
-            with task._lock:
+            with task._metadata_lock:
+                task.metadata['chunks_dir'] = str(chunks_dir)
                 task.metadata["chunks_info"] = manifest
 
-            logger.info(f"Successfully split audio into {len(chunks_info)} chunks")
+            logger.info("Successfully split audio into %s chunks", len(chunks_info))
             return chunks_info
 
         except Exception as e:
-            logger.exception(f"Error splitting audio for task {task.id}: {e}")
+            logger.exception("Error splitting audio for task %s: %s", task.id, e)
+            with task._metadata_lock:
+                task.metadata["error"] = f"Failed to split audio: {e}"
             return None
 
-    def format_timestamp_for_filename(self, seconds: float) -> str:
+    def format_timestamp_for_filename(self, ms: int) -> str:
         """
-        Convert seconds to a filename-safe formatted timestamp.
+        Convert milliseconds to a filename-safe formatted timestamp.
 
         Args:
-            seconds (float): Time in seconds.
+            ms (int): Time in milliseconds.
 
         Returns:
             str: Formatted timestamp string (HH_MM_SS_mmm).
         """
-        try:
-            time = timedelta(seconds=seconds)
-            total_seconds = int(time.total_seconds())
-            hours, remainder = divmod(total_seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            milliseconds = int((time.total_seconds() - total_seconds) * 1000)
-            return f"{hours:02d}_{minutes:02d}_{seconds:02d}_{milliseconds:03d}"
-        except Exception as e:
-            logger.exception(f"Error formatting timestamp for {seconds}s: {e}")
-            return "00_00_00_000"
+        hours, rem = divmod(int(ms), 3_600_000)
+        minutes, rem = divmod(rem, 60_000)
+        secs, milliseconds = divmod(rem, 1000)
+        return f"{hours:02d}_{minutes:02d}_{secs:02d}_{milliseconds:03d}"
 
-    def create_chunk_metadata(self, chunk_path: Path, start_ms: float, end_ms: float, chunk_index: int) -> Dict:
+    def create_chunk_metadata(self, chunk_path: Path, start_ms: int, end_ms: int, chunk_index: int,
+                              created_at: str) -> Dict:
         """
         Create metadata for an audio chunk.
 
         Args:
             chunk_path (Path): Path to the chunk file.
-            start_ms (float): Start time in milliseconds.
-            end_ms (float): End time in milliseconds.
+            start_ms (int): Start time in milliseconds.
+            end_ms (int): End time in milliseconds.
             chunk_index (int): Index of the chunk.
+            created_at (str): ISO timestamp of the split pass that produced the chunk.
 
         Returns:
             Dict: Dictionary containing chunk metadata.
@@ -248,31 +298,25 @@ class AudioSplitter:
                 "audio_format": self.audio_format,
                 "sample_rate": self.sample_rate,
                 "channels": self.channels,
-                "created_at": datetime.now().isoformat()
+                "created_at": created_at
             }
-            logger.debug(f"Created metadata for chunk {chunk_index}: {metadata}")
+            logger.debug("Created metadata for chunk %d: %s", chunk_index, metadata)
             return metadata
         except Exception as e:
-            logger.exception(f"Error creating metadata for chunk {chunk_index}: {e}")
+            logger.exception("Error creating metadata for chunk %s: %s", chunk_index, e)
             return {}
 
-    def format_timestamp_for_metadata(self, ms: float) -> str:
+    def format_timestamp_for_metadata(self, ms: int) -> str:
         """
         Convert milliseconds to a formatted timestamp for metadata display.
 
         Args:
-            ms (float): Time in milliseconds.
+            ms (int): Time in milliseconds.
 
         Returns:
             str: Formatted timestamp string (HH:MM:SS.mmm).
         """
-        try:
-            time = timedelta(milliseconds=ms)
-            total_seconds = int(time.total_seconds())
-            hours, remainder = divmod(total_seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            milliseconds = int(ms % 1000)
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
-        except Exception as e:
-            logger.exception(f"Error formatting timestamp for {ms}ms: {e}")
-            return "00:00:00.000"
+        hours, rem = divmod(int(ms), 3_600_000)
+        minutes, rem = divmod(rem, 60_000)
+        secs, milliseconds = divmod(rem, 1000)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}.{milliseconds:03d}"